@@ -5,6 +5,7 @@ from typing import Final
 from abc import ABC, abstractmethod
 from datetime import datetime
 from signal import signal, SIGINT
+from genotypes.archive import ArchiveNotSupported, save_population
 
 
 class Algorithm(ABC):
@@ -77,12 +78,22 @@ class Algorithm(ABC):
 
 
     def save_population(self):
-        """Save the current population to 'saved_populations' directory"""
+        """Save the current population to 'saved_populations' directory.
+        Population is saved as a single archive file if possible,
+        otherwise each individual is saved to its own file in a new directory.
+        """
         if not os.path.isdir(self.SAVED_POPULATIONS_DIR):
             os.mkdir(self.SAVED_POPULATIONS_DIR)
-        save_dir = self.SAVED_POPULATIONS_DIR+'/'+\
-                   datetime.today().isoformat()+'-'+self.__class__.__name__+'-'+\
-                   self.individual_generator.individual_class.__name__+'/'
+        save_path = self.SAVED_POPULATIONS_DIR+'/'+\
+                    datetime.today().isoformat()+'-'+self.__class__.__name__+'-'+\
+                    self.individual_generator.individual_class.__name__
+        try:
+            save_population(save_path+'.pop', self.population)
+            return
+        except ArchiveNotSupported:
+            pass
+
+        save_dir = save_path+'/'
         os.mkdir(save_dir)
         for i, individual in enumerate(self.population, start=1):
             individual.to_file(save_dir+f'{i:04}')
@@ -8,7 +8,7 @@ class EvolutionStrategy(Algorithm):
 
     def __init__(self, reporters, max_iterations, evaluator, individual_generator,
                  parent_count, children_count, mutation,
-                 elitism=False, crossover=None, target_fitness=None):
+                 elitism=False, crossover=None, target_fitness=None, phenotype_cache=None):
         """Initialize hyperparamters of the algorithm.
 
         :param reporters: List of Reporter instances
@@ -22,6 +22,8 @@ class EvolutionStrategy(Algorithm):
         :param crossover: Crossover to be used. If None, only mutation is used.
         :param target_fitness: If an individual reaches target_fitness the algorithm is stopped.
                                If None, algorithm won't be stopped based on fitness.
+        :param phenotype_cache: Optional PhenotypeCache. Children with already evaluated
+                                phenotype inherit the fitness instead of being evaluated.
         """
         super().__init__(reporters, max_iterations, evaluator, individual_generator, target_fitness)
         self.parent_count = parent_count
@@ -29,6 +31,7 @@ class EvolutionStrategy(Algorithm):
         self.mutation = mutation
         self.elitism = elitism
         self.crossover = crossover
+        self.phenotype_cache = phenotype_cache
 
         self.population = individual_generator.batch_generate(self.parent_count)
         self.children_population = None
@@ -38,6 +41,8 @@ class EvolutionStrategy(Algorithm):
         """Run the algorithm"""
 
         self.evaluator.batch_evaluate(self.population)
+        if self.phenotype_cache is not None:
+            self.phenotype_cache.store_individuals(self.population)
         self._report()
         self.best_individual = self.population[0]
         if self._stop_condition():
@@ -58,7 +63,10 @@ class EvolutionStrategy(Algorithm):
             self.mutation.batch_mutate(self.children_population)
 
             # Evalutation
-            self.evaluator.batch_evaluate(self.children_population)
+            if self.phenotype_cache is not None:
+                self.phenotype_cache.batch_evaluate(self.evaluator, self.children_population)
+            else:
+                self.evaluator.batch_evaluate(self.children_population)
 
             # Generation change
             if not self.elitism:
@@ -44,9 +44,12 @@ class GeneticAlgorithm(Algorithm):
             next_population = []
 
             while len(next_population) < self.population_size:
-                parent_1 = self.selector.select(self.population)
-                parent_2 = self.selector.select(self.population)
-                children = self.crossover.cross(parent_1, parent_2)
+                # Select enough pairs for crossovers that produce two children
+                pair_count = max(1, (self.population_size - len(next_population)) // 2)
+                parent_pairs = [(self.selector.select(self.population),
+                                 self.selector.select(self.population))
+                                for _ in range(pair_count)]
+                children = self.crossover.batch_cross(parent_pairs)
                 self.mutation.batch_mutate(children)
                 next_population.extend(children)
 
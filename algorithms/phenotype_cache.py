@@ -0,0 +1,87 @@
+"""Module containing fitness cache for phenotypically identical individuals"""
+import math
+import random
+
+
+class PhenotypeCache:
+    """Fitness cache keyed by individual's phenotype fingerprint.
+
+    Individuals whose fingerprint was already evaluated inherit the (mean) fitness instead of
+    being evaluated again. Individuals without a fingerprint are always evaluated.
+    Failed evaluations (fitness left None by the evaluator) are not cached,
+    those individuals get -inf.
+    """
+
+    def __init__(self, reevaluation_probability=0.0, max_size=10000):
+        """Initialize the cache
+
+        :param reevaluation_probability: Probability that a cached phenotype is evaluated again.
+                                         Useful for noisy fitness functions.
+                                         Repeated evaluations are averaged.
+        :param max_size: Maximum number of phenotypes to remember
+        """
+        self.reevaluation_probability = reevaluation_probability
+        self.max_size = max_size
+        self.fitnesses = {}
+        self.hits = 0
+        self.misses = 0
+
+    def batch_evaluate(self, evaluator, individuals):
+        """Evaluate individuals that aren't cached using given evaluator
+        and sort all of them by fitness in descending order
+        """
+        to_evaluate = []
+        duplicates = []
+        pending = {}
+        for individual in individuals:
+            fingerprint = individual.fingerprint()
+            if fingerprint is None:
+                to_evaluate.append(individual)
+            elif fingerprint in pending:
+                # Same phenotype is already waiting for evaluation in this batch
+                duplicates.append((individual, fingerprint))
+                self.hits += 1
+            elif (fingerprint in self.fitnesses
+                  and random.random() >= self.reevaluation_probability):
+                individual.fitness = self.fitnesses[fingerprint][0]
+                self.hits += 1
+            else:
+                pending[fingerprint] = individual
+                to_evaluate.append(individual)
+                self.misses += 1
+
+        for individual in to_evaluate:
+            # Fitness of a failed evaluation stays None instead of the one copied from the parent
+            individual.fitness = None
+        evaluator.batch_evaluate(to_evaluate)
+        self.store(pending.items())
+        for individual in to_evaluate:
+            if individual.fitness is None:
+                individual.fitness = -math.inf
+        for fingerprint, individual in pending.items():
+            individual.fitness = self.fitnesses.get(fingerprint, (individual.fitness,))[0]
+        for individual, fingerprint in duplicates:
+            individual.fitness = pending[fingerprint].fitness
+
+        individuals.sort(key=lambda individual: individual.fitness, reverse=True)
+
+    def store(self, evaluated):
+        """Store fitness of evaluated individuals, individuals without fitness are skipped
+
+        :param evaluated: iterable of (fingerprint, individual) pairs
+        """
+        for fingerprint, individual in evaluated:
+            if individual.fitness is None:
+                continue
+            mean, count = self.fitnesses.pop(fingerprint, (0, 0))
+            count += 1
+            self.fitnesses[fingerprint] = (mean + (individual.fitness - mean) / count, count)
+
+        while len(self.fitnesses) > self.max_size:
+            # Dictionaries keep insertion order, drop the least recently stored phenotype
+            del self.fitnesses[next(iter(self.fitnesses))]
+
+    def store_individuals(self, individuals):
+        """Store fitness of evaluated individuals that have a fingerprint"""
+        self.store((individual.fingerprint(), individual) for individual in individuals
+                   if individual.fingerprint() is not None)
@@ -0,0 +1,56 @@
+"""Module containing an end to end benchmark of BreezyEvaluator against local stand-in servers"""
+import sys
+from evaluators.breezy.breezy import BreezyEvaluator
+from evaluators.breezy.standin import StandInBreezyServer
+from evaluators.breezy.reinforcers import last_hit, win
+from genotypes.cgp.cgp import CGPIndividual
+from genotypes.individual import IndividualGenerator
+
+
+def main():
+    """Evaluate a random CGP population on stand-in servers and report ticks/s and latency.
+    Recorded games are replayed if a trace directory is given as the first argument.
+    """
+    trace_directory = sys.argv[1] if len(sys.argv) > 1 else None
+    server_count = 2
+    population_size = 8
+
+    servers = []
+    standins = []
+    for i in range(server_count):
+        breezy_port = 8185 + 2*i
+        listener_address = ('127.0.0.1', breezy_port + 1)
+        standin = StandInBreezyServer(address=('127.0.0.1', breezy_port),
+                                      agent_url=f'http://127.0.0.1:{breezy_port + 1}',
+                                      trace_directory=trace_directory, seed=i)
+        standin.start()
+        standins.append(standin)
+        servers.append((listener_address, f'http://127.0.0.1:{breezy_port}'))
+
+    evaluator = BreezyEvaluator((last_hit.LastHitReinforcer(), win.WinReinforcer()),
+                                servers=servers)
+
+    cgp_hyperparams = {
+        'input_len': evaluator.input_len,
+        'grid_size': (50, 30),
+        'output_len': evaluator.output_len,
+        'constant_len': 4,
+        'compiled': True,
+    }
+    generator = IndividualGenerator(CGPIndividual, cgp_hyperparams)
+    evaluator.batch_evaluate(generator.batch_generate(population_size))
+
+    for i, standin in enumerate(standins):
+        standin.runs_done.wait()
+        stats = standin.stats()
+        latency = stats['latency']
+        print(f"Server {i}: {stats['games']} games, {stats['ticks']} ticks, "
+              f"{stats['ticks_per_second']:.1f} ticks/s, "
+              f"latency p50: {latency['p50']*1000:.2f} ms, p95: {latency['p95']*1000:.2f} ms, "
+              f"max: {latency['max']*1000:.2f} ms")
+        standin.close()
+    evaluator.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -21,3 +21,11 @@ class Crossover(ABC):
 
         :returns: a list of children (even if only one child)
         """
+
+    def batch_cross(self, parent_pairs):
+        """Return a list of children of all given pairs of parents
+
+        :param parent_pairs: list of (parent_1, parent_2) tuples
+        """
+        return [child for parent_1, parent_2 in parent_pairs
+                for child in self.cross(parent_1, parent_2)]
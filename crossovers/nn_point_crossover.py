@@ -1,5 +1,8 @@
 """Module containing k-point crossover for NNIndividual"""
+import random
+import numpy as np
 from genotypes.nn.nn import NNIndividual
+from genotypes.nn.population import NNPopulation
 from .point_crossover import PointCrossover
 
 
@@ -8,11 +11,20 @@ class NNPointCrossover(PointCrossover):
 
     def cross(self, parent_1, parent_2):
         """Return 2 children made by k-point crossover between the parents"""
-        child_chromosomes = self._cross_chromosomes(parent_1.serialize(), parent_2.serialize())
-        layers = self.individual_generator.hyperparameters['layers']
-        activation_functions = self.individual_generator.hyperparameters['activation_functions']
+        return self.batch_cross([(parent_1, parent_2)])
+
 
-        child_1 = NNIndividual.deserialize(child_chromosomes[0], layers, activation_functions)
-        child_2 = NNIndividual.deserialize(child_chromosomes[1], layers, activation_functions)
+    def batch_cross(self, parent_pairs):
+        """Return children of all given pairs of parents made by a single vectorized crossover.
+        Children are rows of one NNPopulation.
+        """
+        first_parents = NNIndividual.stack_parameters([pair[0] for pair in parent_pairs])
+        second_parents = NNIndividual.stack_parameters([pair[1] for pair in parent_pairs])
+        parameters_len = first_parents.shape[1]
+        points = np.array([random.sample(range(1, parameters_len), self.k)
+                           for _ in parent_pairs])
 
-        return child_1, child_2
+        layers = self.individual_generator.hyperparameters['layers']
+        activation_functions = self.individual_generator.hyperparameters['activation_functions']
+        children = NNPopulation.cross(first_parents, second_parents, points)
+        return NNPopulation(children, layers, activation_functions).individuals
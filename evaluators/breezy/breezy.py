@@ -1,9 +1,10 @@
 """Module containing evaluator for breezy server"""
+import gc
 import math
 import copy
-import requests
+import queue
 from ..evaluator import Evaluator
-from .listener import Listener
+from .session import BreezySession
 
 
 class BreezyEvaluator(Evaluator):
@@ -17,7 +18,8 @@ class BreezyEvaluator(Evaluator):
     CREEPS_INDICES = range(85, 211, 14)
 
     def __init__(self, reinforcers, listener_address=('127.0.0.1', 8086),
-                 breezy_url='http://127.0.0.1:8085', crash_callback=None):
+                 breezy_url='http://127.0.0.1:8085', crash_callback=None, incremental=False,
+                 servers=None, defer_gc=False, trace_recorder=None, run_timeout=None):
         """Initialize the Evaluator
 
         :param listener_address: (string, int) tuple containing ip address and
@@ -25,52 +27,38 @@ class BreezyEvaluator(Evaluator):
         :param breezy_url: Url to breezy server
         :param reinforcers: List of reinforcers
         :param crash_callback: Optional function to call when the run crashes.
+        :param incremental: If true, individuals that support it only recompute modules
+                            affected by features that changed since the previous tick.
+                            Reused and recomputed module counts are reported after each run.
+        :param servers: Optional list of (listener_address, breezy_url) pairs.
+                        If given, listener_address and breezy_url are ignored and games are
+                        played on all the servers at the same time.
+                        Each server gets its own copy of the reinforcers.
+        :param defer_gc: If true, automatic garbage collection is disabled while games are
+                         played, young objects are collected between games instead.
+                         This affects the whole process, including other threads.
+        :param trace_recorder: Optional TraceRecorder that records every game played
+        :param run_timeout: Optional number of seconds to wait for the runs of a server to
+                            finish. TimeoutError is raised from batch_evaluate if they don't.
         """
         super().__init__(113, 26)
-        self.listener = Listener(self, address=listener_address, breezy_url=breezy_url)
-        self.breezy_url = breezy_url
+        if servers is None:
+            servers = [(listener_address, breezy_url)]
         self.reinforcers = reinforcers
-        self.individuals = []
+        self.sessions = [BreezySession(self, reinforcers if i == 0 else copy.deepcopy(reinforcers),
+                                       address, url)
+                         for i, (address, url) in enumerate(servers)]
+        self.individuals = queue.Queue()
         self.crash_callback = crash_callback
+        self.incremental = incremental
+        self.defer_gc = defer_gc
+        self.trace_recorder = trace_recorder
+        self.run_timeout = run_timeout
 
 
-    def callback(self, features):
-        """Callback method for listener
-
-        :param features: List of features received from breezy server
-        """
-        processed = self._process(features)
-        actions = self.individuals[0].evaluate(processed)
-        action = actions.index(max(actions))
-        action = action if action < 9 else action+4
-        for reinforcer in self.reinforcers:
-            reinforcer.update(processed, action)
-        return action
-
-
-    def game_done(self, data):
-        """Callback method for finished runs
-
-        :param data: Data received from breezy server
-        """
-        if data['status'] not in ('DONE', 'WAITING'):
-            print('Run not finished cleanly. Data from server below:')
-            print(data)
-            self.listener.stop_server()
-            if self.crash_callback:
-                print('Calling the crash callback function...')
-                self.crash_callback()
-
-            return
-
-        fitness = 0
-        for reinforcer in self.reinforcers:
-            fitness += reinforcer.end(data)
-        self.individuals.pop(0).fitness = fitness
-
-        if 'webhook' in data:
-            webhook_url = self.breezy_url+data['webhook']
-            requests.get(url=webhook_url)
+    def next_individual(self):
+        """Return next individual waiting for a game"""
+        return self.individuals.get_nowait()
 
 
     def evaluate(self, individual):
@@ -78,9 +66,42 @@ class BreezyEvaluator(Evaluator):
 
 
     def batch_evaluate(self, individuals):
-        self.individuals = copy.copy(individuals)
-        self.listener.start(len(individuals))
-        self.listener.join()
+        """Evaluate individuals on all the servers, each server plays its share of the games"""
+        self.individuals = queue.Queue()
+        for individual in individuals:
+            self.individuals.put(individual)
+
+        if self.defer_gc:
+            # Objects that exist before the games never have to be scanned during them
+            gc.collect()
+            gc.freeze()
+            gc.disable()
+        try:
+            session_count = len(self.sessions)
+            started = []
+            for i, session in enumerate(self.sessions):
+                run_count = len(individuals) // session_count \
+                            + (i < len(individuals) % session_count)
+                if run_count:
+                    session.start(run_count)
+                    started.append(session)
+            for session in started:
+                session.join(self.run_timeout)
+        finally:
+            if self.defer_gc:
+                gc.unfreeze()
+                gc.enable()
+
+
+    def latency_stats(self):
+        """Return list of agent response latency summaries of the last runs, one per server"""
+        return [session.listener.latency.summary() for session in self.sessions]
+
+
+    def close(self):
+        """Shut down listeners of all the servers"""
+        for session in self.sessions:
+            session.listener.close()
 
 
     @staticmethod
@@ -1,45 +1,62 @@
-"""Simple HTTPServer and RequestHandler for communicating with Breezy server"""
-from http.server import BaseHTTPRequestHandler, HTTPServer
+"""Threaded keep-alive HTTPServer and RequestHandler for communicating with Breezy server"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
 import threading
+import time
 import json
 import requests
 
 
 class RequestHandler(BaseHTTPRequestHandler):
-    """RequestHandler for communicating with Breezy server"""
+    """RequestHandler for communicating with Breezy server.
+    Connections are kept alive, so every tick doesn't pay for a new connection.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, Nagle's algorithm would delay the body
+    disable_nagle_algorithm = True
 
     def _get_content(self):
         """Extract data from request"""
         length = int(self.headers.get('Content-Length'))
         return json.loads(self.rfile.read(length))
 
-    def _respond(self, response):
-        """Respond to request with given dictionary"""
-        self.send_response(200)
+    def _respond(self, response, status=200):
+        """Respond to request with given string"""
+        body = str(response).encode("utf-8")
+        self.send_response(status)
         self.send_header("Content-type", "text/json")
+        self.send_header("Content-Length", str(len(body)))
         self.end_headers()
-        self.wfile.write(str(response).encode("utf-8"))
+        self.wfile.write(body)
 
     def do_GET(self):
         """Process GET requests"""
         self._respond(json.dumps({}))
-        if self.path == '/':
-            self._respond(json.dumps({}))
 
     def do_POST(self):
         """Process POST requests"""
+        listener = self.server.listener
         if self.path == '/':
-            action = self.server.breezy_evaluator.callback(self._get_content())
+            start = time.perf_counter()
+            action = listener.session.callback(self._get_content())
             self._respond(json.dumps({"actionCode":action}))
+            listener.latency.record(time.perf_counter() - start)
         elif self.path == '/update':
             run_data = self._get_content()
-            self.server.breezy_evaluator.game_done(run_data)
-            if "webhook" in run_data:
-                webhook_url = self.server.breezy_url + run_data['webhook']
-                requests.get(webhook_url)
+            # Game is finished before responding, so ticks of the next game can't be mixed in
+            listener.session.game_done(run_data)
+            self._respond(json.dumps({}))
+            if "webhook" not in run_data:
+                listener.stop_server()
+        else:
+            # Unread body would be parsed as the next request on the kept alive connection
+            length = self.headers.get('Content-Length')
+            if length is None:
+                self.close_connection = True
             else:
-                self.server.running = False
-            self.send_response(200)
+                self.rfile.read(int(length))
+            self._respond(json.dumps({}), status=404)
 
     def log_message(self, format, *args):
         """Silence logging"""
@@ -51,14 +68,59 @@ class RequestHandler(BaseHTTPRequestHandler):
         print(' '.join(indexed))
 
 
+class LatencyStats:
+    """Response latency of the agent for each tick, in seconds"""
+
+    def __init__(self):
+        self.samples = []
+
+    def record(self, latency):
+        """Record latency of one tick"""
+        self.samples.append(latency)
+
+    def reset(self):
+        """Forget all recorded latencies"""
+        self.samples = []
+
+    def summary(self):
+        """Return dictionary with count, mean, p50, p95 and max latency"""
+        samples = sorted(self.samples)
+        if not samples:
+            return {'count': 0, 'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+        return {
+            'count': len(samples),
+            'mean': sum(samples) / len(samples),
+            'p50': samples[(len(samples) - 1) // 2],
+            'p95': samples[int(0.95 * (len(samples) - 1))],
+            'max': samples[-1],
+        }
+
+    def __str__(self):
+        summary = self.summary()
+        return (f"Ticks: {summary['count']}, latency mean: {summary['mean']*1000:.2f} ms, "
+                f"p50: {summary['p50']*1000:.2f} ms, p95: {summary['p95']*1000:.2f} ms, "
+                f"max: {summary['max']*1000:.2f} ms")
+
+
 class Listener:
-    """HTTPServer for communicating with Breezy server"""
-    def __init__(self, breezy_evaluator, address=('127.0.0.1', 8086),
+    """Threaded HTTPServer for communicating with Breezy server.
+
+    The server is started with the first runs and keeps serving between them.
+    Requests to the Breezy server share a pool of connections, webhooks are called
+    in the background so they never block a response to the server.
+    """
+    def __init__(self, session, address=('127.0.0.1', 8086),
                  breezy_url='http://127.0.0.1:8085'):
-        self._server = HTTPServer(address, RequestHandler)
-        self._server.breezy_url = breezy_url
-        self._server.breezy_evaluator = breezy_evaluator
-        self._thread = None
+        self._server = ThreadingHTTPServer(address, RequestHandler)
+        self._server.daemon_threads = True
+        self._server.listener = self
+        self._serve_thread = None
+        self._runs_done = threading.Event()
+        self._webhook_executor = ThreadPoolExecutor(max_workers=1)
+        self.http = requests.Session()
+        self.session = session
+        self.breezy_url = breezy_url
+        self.latency = LatencyStats()
         self.agent_config = {
             'host': address[0],
             'port': address[1],
@@ -68,29 +130,48 @@ class Listener:
         }
         self.run_count = 0
 
-    def _run(self):
+    def _start_runs(self):
         start_data = {
             'agent': 'Agent',
             'size': self.run_count
         }
-        requests.post(url=self._server.breezy_url+'/run/', data=json.dumps(start_data))
-        self._server.running = True
-        while self._server.running:
-            self._server.handle_request()
+        self.http.post(url=self.breezy_url+'/run/', data=json.dumps(start_data))
 
     def start(self, run_count):
-        """Start the runs"""
+        """Start the runs. Errors of the request that starts them are raised."""
         self.run_count = run_count
-        self._thread = threading.Thread(target=self._run)
-        self._thread.daemon = True
-#        requests.post(url=self._server.breezy_url+'/agent/config',
-#                      data=json.dumps(self.agent_config))
-        self._thread.start()
+        self._runs_done.clear()
+        self.latency.reset()
+        if self._serve_thread is None:
+            self._serve_thread = threading.Thread(target=self._server.serve_forever)
+            self._serve_thread.daemon = True
+            self._serve_thread.start()
+#        self.http.post(url=self.breezy_url+'/agent/config',
+#                       data=json.dumps(self.agent_config))
+        self._start_runs()
+
+    def webhook(self, route):
+        """Call given webhook route of the Breezy server in the background"""
+        self._webhook_executor.submit(self.http.get, self.breezy_url+route)
 
-    def join(self):
-        """Wait until runs finish"""
-        self._thread.join()
+    def join(self, timeout=None):
+        """Wait until runs finish
+
+        :param timeout: Seconds to wait, TimeoutError is raised if the runs don't finish
+                        in time. Waits forever if None.
+        """
+        if not self._runs_done.wait(timeout):
+            raise TimeoutError(f'Runs on {self.breezy_url} did not finish in {timeout} s')
 
     def stop_server(self):
-        """Stop HTTP server"""
-        self._server.running = False
+        """Mark the runs as finished. Server keeps listening for the next runs."""
+        self._runs_done.set()
+
+    def close(self):
+        """Shut the HTTP server down"""
+        if self._serve_thread is not None:
+            self._server.shutdown()
+            self._serve_thread = None
+        self._server.server_close()
+        self._webhook_executor.shutdown(wait=False)
+        self.http.close()
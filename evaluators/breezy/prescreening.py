@@ -0,0 +1,134 @@
+"""Module containing surrogate pre-screening of individuals before live Breezy games"""
+import math
+import numpy as np
+from ..evaluator import Evaluator
+from .trace import read_index, load_game
+
+
+class PrescreeningEvaluator(Evaluator):
+    """Wrapper that plays live games only with promising individuals.
+
+    Behaviour of an individual is the action it chooses in each of the game states recorded
+    in traces. Individuals that behave exactly like an already evaluated individual
+    (e.g. their parent) inherit its mean fitness. Fitness of the other individuals is
+    predicted from the individuals with the most similar behaviour, and only the best
+    live_fraction of them are evaluated by the wrapped evaluator.
+    The rest are not played. A prediction is only a guess, so their fitness is -inf and
+    they can't be selected over an individual with measured fitness. They are ranked after
+    the measured individuals, by predicted fitness. Individuals whose live game fails
+    are ranked last.
+    """
+
+    def __init__(self, evaluator, trace_directory, live_fraction=0.5, neighbours=3,
+                 max_states=2000, archive_size=1000):
+        """Initialize the evaluator
+
+        :param evaluator: Evaluator used for the live games, usually a BreezyEvaluator
+        :param trace_directory: Directory with games recorded by TraceRecorder
+        :param live_fraction: Fraction of individuals with new behaviour that get a live game
+        :param neighbours: Number of most similar evaluated individuals used to predict fitness.
+                           Everyone gets a live game until that many have been evaluated.
+        :param max_states: Maximum number of recorded states to compare behaviour on
+        :param archive_size: Maximum number of evaluated behaviours to remember
+        """
+        super().__init__(evaluator.input_len, evaluator.output_len)
+        self.evaluator = evaluator
+        self.live_fraction = live_fraction
+        self.neighbours = neighbours
+        self.archive_size = archive_size
+
+        states = [load_game(trace_directory, entry)['processed']
+                  for entry in read_index(trace_directory) if entry['ticks']]
+        if not states:
+            raise ValueError(f'No recorded game states in {trace_directory}')
+        states = np.concatenate(states)
+        if len(states) > max_states:
+            states = states[np.linspace(0, len(states) - 1, max_states).astype(int)]
+        self.states = states
+
+        # behaviour bytes -> [mean fitness, evaluation count, behaviour]
+        self.archive = {}
+        self.inherited = 0
+        self.predicted = 0
+        self.live = 0
+        self.failed = 0
+
+    def behaviour(self, individual):
+        """Return array of actions the individual chooses in the recorded states"""
+        outputs = np.asarray(individual.evaluate_batch(self.states))
+        return np.argmax(outputs, axis=1).astype(np.int8)
+
+    def evaluate(self, individual):
+        self.batch_evaluate([individual])
+
+    def batch_evaluate(self, individuals):
+        """Evaluate promising individuals live and sort all the individuals by fitness
+        in descending order, individuals that were not played by predicted fitness
+        """
+        novel = {}
+        # id of individual -> predicted fitness, for individuals that are not played
+        predicted = {}
+        for individual in individuals:
+            behaviour = self.behaviour(individual)
+            key = behaviour.tobytes()
+            if key in self.archive:
+                individual.fitness = self.archive[key][0]
+                self.inherited += 1
+            else:
+                novel.setdefault(key, (behaviour, []))[1].append(individual)
+
+        representatives = [(key, behaviour, group[0]) for key, (behaviour, group) in novel.items()]
+        if len(self.archive) < self.neighbours:
+            live = representatives
+        else:
+            predictions = [self._predict(behaviour) for _, behaviour, _ in representatives]
+            order = sorted(range(len(representatives)), key=lambda i: predictions[i],
+                           reverse=True)
+            live_count = math.ceil(self.live_fraction * len(representatives))
+            live = [representatives[i] for i in order[:live_count]]
+            for i in order[live_count:]:
+                representatives[i][2].fitness = -math.inf
+                predicted[id(representatives[i][2])] = predictions[i]
+                self.predicted += 1
+
+        for _, _, individual in live:
+            # Fitness of a failed game stays None instead of the one copied from the parent
+            individual.fitness = None
+        self.evaluator.batch_evaluate([individual for _, _, individual in live])
+        self.live += len(live)
+        for key, behaviour, individual in live:
+            if individual.fitness is None:
+                individual.fitness = -math.inf
+                self.failed += 1
+            else:
+                self._store(key, behaviour, individual.fitness)
+
+        # Individuals with the same new behaviour share fitness of their representative
+        for _, group in novel.values():
+            for individual in group[1:]:
+                individual.fitness = group[0].fitness
+                if id(group[0]) in predicted:
+                    predicted[id(individual)] = predicted[id(group[0])]
+                self.inherited += 1
+
+        individuals.sort(key=lambda individual: (individual.fitness,
+                                                 predicted.get(id(individual), -math.inf)),
+                         reverse=True)
+
+    def _predict(self, behaviour):
+        """Predict fitness as distance weighted mean fitness of the most similar behaviours"""
+        entries = list(self.archive.values())
+        behaviours = np.stack([entry[2] for entry in entries])
+        distances = np.count_nonzero(behaviours != behaviour, axis=1) / len(behaviour)
+        nearest = np.argsort(distances)[:self.neighbours]
+        weights = 1 / (distances[nearest] + 1e-3)
+        fitnesses = np.array([entries[i][0] for i in nearest])
+        return float(np.sum(weights * fitnesses) / np.sum(weights))
+
+    def _store(self, key, behaviour, fitness):
+        mean, count, _ = self.archive.pop(key, (0, 0, behaviour))
+        count += 1
+        self.archive[key] = [mean + (fitness - mean) / count, count, behaviour]
+        while len(self.archive) > self.archive_size:
+            # Dictionaries keep insertion order, drop the least recently evaluated behaviour
+            del self.archive[next(iter(self.archive))]
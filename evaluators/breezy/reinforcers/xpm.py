@@ -20,4 +20,4 @@ class XPMReinforcer(Reinforcer):
         self.time = features[39]
 
     def end(self, data):
-        return self.XP_AMOUNTS[self.level] * 60/self.time * self.multiplier
+        return self.XP_AMOUNTS[int(self.level)] * 60/self.time * self.multiplier
@@ -0,0 +1,114 @@
+"""Module containing a session of games played on a single Breezy server"""
+import gc
+from .listener import Listener
+
+
+class BreezySession:
+    """Games played on one Breezy server, one after another.
+
+    Each session has its own listener and reinforcers, so sessions on different servers
+    can run at the same time. Individual for each game is taken from the evaluator's queue
+    when the game starts.
+    """
+
+    def __init__(self, evaluator, reinforcers, listener_address, breezy_url):
+        """Initialize the session
+
+        :param evaluator: BreezyEvaluator that owns the session
+        :param reinforcers: List of reinforcers used only by this session
+        :param listener_address: (string, int) tuple containing ip address and
+                                 port that the listener will use
+        :param breezy_url: Url to breezy server
+        """
+        self.evaluator = evaluator
+        self.reinforcers = reinforcers
+        self.breezy_url = breezy_url
+        self.listener = Listener(self, address=listener_address, breezy_url=breezy_url)
+        self.individual = None
+        self.trace = None
+        self.tick_stats = []
+
+
+    def _current_individual(self):
+        """Return individual playing the current game, taking the next one if a game starts"""
+        if self.individual is None:
+            self.individual = self.evaluator.next_individual()
+            if self.evaluator.trace_recorder is not None:
+                self.trace = self.evaluator.trace_recorder.start_game()
+        return self.individual
+
+
+    def callback(self, features):
+        """Callback method for listener
+
+        :param features: List of features received from breezy server
+        """
+        processed = self.evaluator._process(features)
+        individual = self._current_individual()
+        if self.evaluator.incremental and hasattr(individual, 'evaluate_incremental'):
+            actions = individual.evaluate_incremental(processed)
+            self.tick_stats.append(individual.incremental_stats)
+        else:
+            actions = individual.evaluate(processed)
+        action = actions.index(max(actions))
+        action = action if action < 9 else action+4
+        for reinforcer in self.reinforcers:
+            reinforcer.update(processed, action)
+        if self.trace is not None:
+            self.trace.record(features, processed, action)
+        return action
+
+
+    def game_done(self, data):
+        """Callback method for finished runs
+
+        :param data: Data received from breezy server
+        """
+        if data['status'] not in ('DONE', 'WAITING'):
+            print('Run not finished cleanly. Data from server below:')
+            print(data)
+            self._end_trace(data)
+            self.listener.stop_server()
+            if self.evaluator.crash_callback:
+                print('Calling the crash callback function...')
+                self.evaluator.crash_callback()
+
+            return
+
+        fitness = 0
+        for reinforcer in self.reinforcers:
+            fitness += reinforcer.end(data)
+        self._current_individual().fitness = fitness
+        self.individual = None
+        self._end_trace(data, fitness)
+
+        if self.tick_stats:
+            reused = sum(stats[0] for stats in self.tick_stats)
+            recomputed = sum(stats[1] for stats in self.tick_stats)
+            print(f'Ticks: {len(self.tick_stats)}, reused modules: {reused}, '
+                  f'recomputed modules: {recomputed}')
+            self.tick_stats = []
+
+        if self.evaluator.defer_gc:
+            gc.collect(1)
+
+        if 'webhook' in data:
+            self.listener.webhook(data['webhook'])
+
+
+    def _end_trace(self, data, fitness=None):
+        """Hand trace of the finished game over to the recorder"""
+        if self.trace is not None:
+            self.evaluator.trace_recorder.end_game(self.trace, data, fitness)
+            self.trace = None
+
+
+    def start(self, run_count):
+        """Start given number of runs on the server"""
+        self.individual = None
+        self.listener.start(run_count)
+
+
+    def join(self, timeout=None):
+        """Wait until runs finish, see Listener.join"""
+        self.listener.join(timeout)
@@ -0,0 +1,167 @@
+"""Module containing a local stand-in for Breezy server.
+
+The stand-in speaks the same protocol as Breezy server: runs are started with POST /run/,
+every tick the features are relayed to the agent, the agent is notified about finished games
+with POST /update and the next game starts once the agent calls the webhook it received.
+Games are replayed from recorded traces or generated synthetically and are played as fast
+as the agent answers, so Listener and BreezyEvaluator can be tested and benchmarked without
+Dota 2.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import random
+import threading
+import time
+import requests
+from .listener import LatencyStats
+from .trace import read_index, load_game
+
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    """RequestHandler of the stand-in server"""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def _respond(self, response):
+        body = json.dumps(response).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-type", "text/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        """Process POST requests"""
+        length = int(self.headers.get('Content-Length', 0))
+        content = json.loads(self.rfile.read(length)) if length else {}
+        self._respond({})
+        if self.path.rstrip('/') == '/run':
+            self.server.standin.run(content.get('size', 1))
+
+    def do_GET(self):
+        """Process GET requests, webhooks are GET requests"""
+        self._respond({})
+        self.server.standin.webhook_called(self.path)
+
+    def log_message(self, format, *args):
+        """Silence logging"""
+        return
+
+
+class StandInBreezyServer:
+    """Local stand-in for Breezy server"""
+
+    WEBHOOK_ROUTE = '/webhook/'
+
+    def __init__(self, address=('127.0.0.1', 8085), agent_url='http://127.0.0.1:8086',
+                 trace_directory=None, ticks=200, feature_len=320, webhook_timeout=10,
+                 seed=None):
+        """Initialize the server
+
+        :param address: (string, int) tuple containing ip address and port of the server
+        :param agent_url: Url of the agent's listener
+        :param trace_directory: Directory with games recorded by TraceRecorder to replay.
+                                Games are generated synthetically if None.
+        :param ticks: Number of ticks of a synthetic game
+        :param feature_len: Number of features in a synthetic tick
+        :param webhook_timeout: Seconds to wait for the agent to call the webhook
+        :param seed: Seed of the synthetic games
+        """
+        self.agent_url = agent_url
+        self.ticks = ticks
+        self.feature_len = feature_len
+        self.webhook_timeout = webhook_timeout
+        self.random = random.Random(seed)
+        self.games = []
+        if trace_directory is not None:
+            for entry in read_index(trace_directory):
+                raw = load_game(trace_directory, entry)['raw']
+                if len(raw):
+                    self.games.append((raw.tolist(), entry.get('data') or {}))
+
+        self.latency = LatencyStats()
+        self.tick_count = 0
+        self.game_count = 0
+        self.elapsed = 0.0
+        self.runs_done = threading.Event()
+        self.runs_done.set()
+        self._webhook = threading.Event()
+        self._http = requests.Session()
+        self._server = ThreadingHTTPServer(address, StandInRequestHandler)
+        self._server.daemon_threads = True
+        self._server.standin = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def start(self):
+        """Start serving"""
+        self._thread.start()
+
+    def close(self):
+        """Stop serving"""
+        self._server.shutdown()
+        self._server.server_close()
+        self._http.close()
+
+    def run(self, size):
+        """Play given number of games in the background"""
+        self.runs_done.clear()
+        threading.Thread(target=self._play_games, args=(size,), daemon=True).start()
+
+    def webhook_called(self, path):
+        """Let the next game start"""
+        if path.startswith(self.WEBHOOK_ROUTE):
+            self._webhook.set()
+
+    def stats(self):
+        """Return dictionary with played games, ticks, ticks per second and latency summary"""
+        return {
+            'games': self.game_count,
+            'ticks': self.tick_count,
+            'ticks_per_second': self.tick_count / self.elapsed if self.elapsed else 0.0,
+            'latency': self.latency.summary(),
+        }
+
+    def _next_game(self):
+        """Return list of ticks and end of game data for the next game"""
+        if self.games:
+            return self.games[self.game_count % len(self.games)]
+        return ([self._synthetic_features(tick) for tick in range(self.ticks)],
+                {'winner': self.random.choice(('Radiant', 'Dire'))})
+
+    def _synthetic_features(self, tick):
+        features = [float(self.random.randint(1, 1000)) for _ in range(self.feature_len)]
+        for i in range(85, 211, 14):
+            features[i+2] = self.random.choice((-1, -1, 875, 550, 300))
+        features[1] = float(self.random.randint(1, 30)) # hero level
+        features[56] = float(tick + 1) # game time
+        return features
+
+    def _play_games(self, size):
+        try:
+            for game in range(size):
+                ticks, end_data = self._next_game()
+                bodies = [json.dumps(features) for features in ticks]
+
+                start = time.perf_counter()
+                for body in bodies:
+                    tick_start = time.perf_counter()
+                    response = self._http.post(self.agent_url + '/', data=body)
+                    if 'actionCode' not in json.loads(response.text):
+                        raise ValueError(f'Agent did not respond with an action: {response.text}')
+                    self.latency.record(time.perf_counter() - tick_start)
+                self.elapsed += time.perf_counter() - start
+                self.tick_count += len(bodies)
+                self.game_count += 1
+
+                data = {'status': 'DONE', 'winner': end_data.get('winner', 'Dire')}
+                last = game == size - 1
+                if not last:
+                    data['webhook'] = f'{self.WEBHOOK_ROUTE}{self.game_count}'
+                self._webhook.clear()
+                self._http.post(self.agent_url + '/update', data=json.dumps(data))
+                if not last and not self._webhook.wait(self.webhook_timeout):
+                    print('Agent did not call the webhook, stopping the run')
+                    return
+        finally:
+            self.runs_done.set()
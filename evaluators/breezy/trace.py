@@ -0,0 +1,151 @@
+"""Module containing recorder of Breezy games for offline analysis and benchmarks.
+
+Each recorded game is saved as a compressed .npz file with per-tick arrays:
+    raw         (ticks x features) features received from breezy server
+    processed   (ticks x processed features) inputs of the individual
+    actions     (ticks,) actions the individual chose
+Every finished game also appends a line with its file name, tick count, fitness and
+data received at the end of the game to 'index.jsonl' in the trace directory.
+"""
+import os
+import json
+import queue
+import threading
+import itertools
+from datetime import datetime
+import numpy as np
+
+
+INDEX_FILE = 'index.jsonl'
+
+
+class GameTrace:
+    """Ticks of a single game. Rows are collected in chunks that the writer thread
+    turns into arrays, so recording a tick only appends references.
+    """
+
+    def __init__(self, recorder, game_id):
+        self.recorder = recorder
+        self.game_id = game_id
+        self.tick_count = 0
+        self.rows = []
+        # Arrays of finished chunks, only touched by the writer thread
+        self.chunks = []
+
+    def record(self, raw, processed, action):
+        """Record one tick
+
+        :param raw: list of features received from breezy server
+        :param processed: list of processed features
+        :param action: action the individual chose
+        """
+        self.rows.append((raw, processed, action))
+        self.tick_count += 1
+        if len(self.rows) >= self.recorder.chunk_size:
+            self.recorder.submit(self, self.rows)
+            self.rows = []
+
+
+class TraceRecorder:
+    """Opt-in recorder of Breezy games.
+    Converting and writing traces happens on a background thread.
+    """
+
+    def __init__(self, directory='./traces', chunk_size=256, max_pending_chunks=1024):
+        """Initialize the recorder and start the writer thread
+
+        :param directory: Directory to save traces into. Created if it doesn't exist.
+        :param chunk_size: Number of ticks handed to the writer thread at once
+        :param max_pending_chunks: Maximum number of chunks waiting for the writer thread.
+                                   If the writer falls behind, recording blocks.
+        """
+        self.directory = directory
+        self.chunk_size = chunk_size
+        os.makedirs(directory, exist_ok=True)
+        self._prefix = datetime.today().strftime('%Y%m%dT%H%M%S')
+        self._game_ids = itertools.count(1)
+        self._game_ids_lock = threading.Lock()
+        self._queue = queue.Queue(max_pending_chunks)
+        self._thread = threading.Thread(target=self._write, daemon=True)
+        self._thread.start()
+
+    def start_game(self):
+        """Return a new GameTrace to record ticks into"""
+        with self._game_ids_lock:
+            game_id = next(self._game_ids)
+        return GameTrace(self, game_id)
+
+    def end_game(self, trace, data, fitness=None):
+        """Hand finished game over to the writer thread
+
+        :param trace: GameTrace of the game
+        :param data: Data received from breezy server at the end of the game
+        :param fitness: Fitness the individual got for the game
+        """
+        if trace.rows:
+            self.submit(trace, trace.rows)
+            trace.rows = []
+        self._queue.put((trace, {'data': data, 'fitness': fitness}))
+
+    def flush(self):
+        """Wait until all finished games are written"""
+        self._queue.join()
+
+    def close(self):
+        """Write all finished games and stop the writer thread"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def submit(self, trace, rows):
+        """Hand recorded ticks of given game over to the writer thread"""
+        self._queue.put((trace, rows))
+
+    def _write(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                trace, payload = item
+                if isinstance(payload, dict):
+                    self._save(trace, payload)
+                else:
+                    raw, processed, actions = zip(*payload)
+                    trace.chunks.append((np.array(raw, dtype=float),
+                                         np.array(processed, dtype=float),
+                                         np.array(actions, dtype=np.int16)))
+            except Exception as exception:
+                print(f'Failed to record a game trace: {exception!r}')
+            finally:
+                self._queue.task_done()
+
+    def _save(self, trace, summary):
+        file_name = f'{self._prefix}-{trace.game_id:06d}.npz'
+        if trace.chunks:
+            raw, processed, actions = (np.concatenate(arrays) for arrays in zip(*trace.chunks))
+        else:
+            raw, processed, actions = np.empty((0, 0)), np.empty((0, 0)), np.empty(0, np.int16)
+        trace.chunks = []
+        np.savez_compressed(os.path.join(self.directory, file_name),
+                            raw=raw, processed=processed, actions=actions)
+
+        entry = {'file': file_name, 'ticks': len(actions)}
+        entry.update(summary)
+        with open(os.path.join(self.directory, INDEX_FILE), 'a', encoding='utf-8') as index_file:
+            index_file.write(json.dumps(entry, default=str) + '\n')
+
+
+def read_index(directory):
+    """Return list of index entries of games recorded in given directory"""
+    with open(os.path.join(directory, INDEX_FILE), 'r', encoding='utf-8') as index_file:
+        return [json.loads(line) for line in index_file if line.strip()]
+
+
+def load_game(directory, entry):
+    """Return dictionary with raw, processed and actions arrays of given recorded game
+
+    :param directory: Directory with the traces
+    :param entry: Index entry of the game, as returned by read_index
+    """
+    with np.load(os.path.join(directory, entry['file'])) as game:
+        return {name: game[name] for name in ('raw', 'processed', 'actions')}
@@ -0,0 +1,104 @@
+"""Module containing abstract evaluator for problems given by a dataset"""
+from abc import abstractmethod
+from multiprocessing import shared_memory
+import numpy as np
+from .evaluator import Evaluator
+
+
+class DatasetEvaluator(Evaluator):
+    """Abstract evaluator that scores individuals on a fixed dataset.
+    Individuals are evaluated on all the samples at once using evaluate_batch, and batches of
+    individuals of the same class are evaluated together using evaluate_population.
+
+    Dataset can be published to shared memory with share(). Copies of a shared evaluator
+    made by pickling (e.g. in worker processes) attach to the same memory instead of
+    copying the dataset.
+    """
+
+    SHARED_ARRAYS = ('inputs', 'targets')
+
+    def __init__(self, inputs, targets, input_len, output_len):
+        """Initialize the evaluator
+
+        :param inputs: (samples x input_len) matrix of inputs
+        :param targets: expected values for each sample
+        """
+        super().__init__(input_len, output_len)
+        self.inputs = np.asarray(inputs, dtype=float)
+        self.targets = np.asarray(targets)
+        self.shared_memory = {}
+        self.shared_memory_owner = False
+
+    def share(self):
+        """Move dataset arrays to shared memory"""
+        if self.shared_memory:
+            return
+        for attribute in self.SHARED_ARRAYS:
+            array = getattr(self, attribute)
+            memory = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            shared = np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)
+            shared[...] = array
+            self.shared_memory[attribute] = memory
+            setattr(self, attribute, shared)
+        self.shared_memory_owner = True
+
+    def close(self):
+        """Release shared memory. Memory is freed once the evaluator that shared it is closed."""
+        for attribute, memory in self.shared_memory.items():
+            # Arrays can't outlive the memory they are views into
+            setattr(self, attribute, np.array(getattr(self, attribute)))
+            memory.close()
+            if self.shared_memory_owner:
+                memory.unlink()
+        self.shared_memory = {}
+        self.shared_memory_owner = False
+
+    def __getstate__(self):
+        """Shared arrays are pickled as references to their shared memory"""
+        state = self.__dict__.copy()
+        state['shared_memory'] = {}
+        for attribute, memory in self.shared_memory.items():
+            array = state[attribute]
+            state[attribute] = None
+            state['shared_memory'][attribute] = (memory.name, array.shape, array.dtype.str)
+        state['shared_memory_owner'] = False
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.shared_memory = {}
+        for attribute, (name, shape, dtype) in state['shared_memory'].items():
+            memory = _attach_shared_memory(name)
+            self.shared_memory[attribute] = memory
+            setattr(self, attribute, np.ndarray(shape, dtype=dtype, buffer=memory.buf))
+
+    def evaluate(self, individual):
+        """Evaluate the individual on the whole dataset"""
+        outputs = individual.evaluate_batch(self.inputs)
+        individual.fitness = self.fitness(outputs[np.newaxis]).tolist()[0]
+
+    def batch_evaluate(self, individuals):
+        """Evaluate a batch of individuals and sort them by fitness in descending order"""
+        groups = {}
+        for individual in individuals:
+            groups.setdefault(type(individual), []).append(individual)
+
+        for individual_class, group in groups.items():
+            fitnesses = self.fitness(individual_class.evaluate_population(group, self.inputs))
+            for individual, fitness in zip(group, fitnesses.tolist()):
+                individual.fitness = fitness
+
+        individuals.sort(key=lambda individual: individual.fitness, reverse=True)
+
+    @abstractmethod
+    def fitness(self, outputs):
+        """Return array of fitness values for given (individuals x samples x output_len) outputs"""
+
+
+def _attach_shared_memory(name):
+    """Attach to existing shared memory without taking over its cleanup"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 can't opt out of tracking. Blocks are unlinked by their owner anyway.
+        return shared_memory.SharedMemory(name=name)
@@ -1,27 +1,18 @@
 """Module containing evaluator for Iris flower clasificator.
 It uses famous Ronald Fisher's dataset."""
 from os.path import dirname, join
-from ..evaluator import Evaluator
+import numpy as np
+from ..dataset_evaluator import DatasetEvaluator
 
 
-class IrisFlowerEvaluator(Evaluator):
+class IrisFlowerEvaluator(DatasetEvaluator):
     """Iris Flower Classification Evaluator"""
 
     def __init__(self):
         """Initialize the evaluator"""
-        super().__init__(4, 3)
+        dataset = np.loadtxt(join(dirname(__file__), 'iris.csv'), delimiter=',')
+        super().__init__(dataset[:, :-1], dataset[:, -1].astype(int), 4, 3)
 
-        with open(join(dirname(__file__), 'iris.csv'), 'r') as dataset_file:
-            self.dataset = [[float(x) for x in line.rstrip().split(',')]
-                            for line in dataset_file.readlines()]
-
-    def evaluate(self, individual):
-        """Evaluate the individual on the whole dataset"""
-        fitness = 0
-        for datapoint in self.dataset:
-            output = individual.evaluate(datapoint[:-1])
-            result = output.index(max(output))
-            if result == datapoint[-1]:
-                fitness += 1
-
-        individual.fitness = fitness
+    def fitness(self, outputs):
+        """Fitness is the number of correctly classified flowers"""
+        return np.count_nonzero(np.argmax(outputs, axis=2) == self.targets, axis=1)
@@ -1,9 +1,10 @@
 """Module containing Evaluator for custom math function"""
+import numpy as np
 from py_expression_eval import Parser
-from .evaluator import Evaluator
+from .dataset_evaluator import DatasetEvaluator
 
 
-class MathFunctionEvaluator(Evaluator):
+class MathFunctionEvaluator(DatasetEvaluator):
     """Math function evaluator class"""
 
     def __init__(self, expression, sample_points):
@@ -13,15 +14,10 @@ class MathFunctionEvaluator(Evaluator):
         """
         expression = Parser().parse(expression)
         variables = expression.variables()
-        super().__init__(len(variables), 1)
-        self.inputs = sample_points
         inputs_dicts = [dict(zip(variables, sample_point)) for sample_point in sample_points]
-        self.outputs = [expression.evaluate(input_dict) for input_dict in inputs_dicts]
+        outputs = [expression.evaluate(input_dict) for input_dict in inputs_dicts]
+        super().__init__(sample_points, outputs, len(variables), 1)
 
-    def evaluate(self, individual):
-        """Evaluate the individual across all sample points using MSE.
-        Fitness is calculated as a negative MSE
-        """
-        outputs = [individual.evaluate(point)[0] for point in self.inputs]
-        diffs = [(output - expected)**2 for output, expected in zip(outputs, self.outputs)]
-        individual.fitness = - sum(diffs) / len(diffs)
+    def fitness(self, outputs):
+        """Fitness is calculated as a negative MSE across all sample points"""
+        return - np.mean((outputs[:, :, 0] - self.targets)**2, axis=1)
@@ -0,0 +1,79 @@
+"""Module containing evaluator that spreads evaluation over a pool of processes"""
+import multiprocessing
+import os
+from .evaluator import Evaluator
+from .dataset_evaluator import DatasetEvaluator
+
+
+# Evaluator used by the worker process, set once by the pool initializer
+_worker_evaluator = None
+
+
+def _init_worker(evaluator):
+    global _worker_evaluator
+    _worker_evaluator = evaluator
+
+
+def _evaluate_chunk(individuals):
+    """Evaluate individuals in a worker process and return their fitness values in order"""
+    # batch_evaluate sorts the list it is given, so it gets a copy
+    _worker_evaluator.batch_evaluate(list(individuals))
+    return [individual.fitness for individual in individuals]
+
+
+class ParallelEvaluator(Evaluator):
+    """Wrapper that evaluates batches of individuals in a pool of processes.
+
+    Each worker receives a copy of the wrapped evaluator once, when the pool is started.
+    Individuals are sent to the workers in chunks and only their fitness values are sent back.
+    Wrapped evaluator has to be picklable and its fitness can't depend on shared state
+    between evaluations (e.g. a game server).
+    Datasets of DatasetEvaluators are shared with the workers instead of being copied.
+    """
+
+    def __init__(self, evaluator, processes=None, chunks_per_process=2):
+        """Initialize the evaluator and start the pool
+
+        :param evaluator: Evaluator to run in the worker processes
+        :param processes: Number of worker processes. Number of CPUs if None.
+        :param chunks_per_process: Number of chunks each batch is split into per process.
+                                   More chunks balance the load better, fewer chunks let
+                                   the wrapped evaluator evaluate bigger batches at once.
+        """
+        super().__init__(evaluator.input_len, evaluator.output_len)
+        self.evaluator = evaluator
+        self.processes = processes or os.cpu_count()
+        self.chunks_per_process = chunks_per_process
+        if isinstance(evaluator, DatasetEvaluator):
+            evaluator.share()
+        self.pool = multiprocessing.Pool(self.processes, initializer=_init_worker,
+                                         initargs=(evaluator,))
+
+    def evaluate(self, individual):
+        """Evaluate a single individual in this process"""
+        self.evaluator.evaluate(individual)
+
+    def batch_evaluate(self, individuals):
+        """Evaluate a batch of individuals in the pool and sort them by fitness
+        in descending order
+        """
+        chunk_count = min(len(individuals), self.processes * self.chunks_per_process)
+        if chunk_count <= 1:
+            self.evaluator.batch_evaluate(individuals)
+            return
+
+        # Contiguous chunks of (nearly) the same size
+        bounds = [len(individuals) * i // chunk_count for i in range(chunk_count + 1)]
+        chunks = [individuals[bounds[i]:bounds[i+1]] for i in range(chunk_count)]
+        for chunk, fitnesses in zip(chunks, self.pool.map(_evaluate_chunk, chunks)):
+            for individual, fitness in zip(chunk, fitnesses):
+                individual.fitness = fitness
+
+        individuals.sort(key=lambda individual: individual.fitness, reverse=True)
+
+    def close(self):
+        """Stop the worker processes"""
+        self.pool.close()
+        self.pool.join()
+        if isinstance(self.evaluator, DatasetEvaluator):
+            self.evaluator.close()
@@ -0,0 +1,128 @@
+"""Module containing racing evaluator for noisy fitness functions"""
+import math
+import weakref
+from .evaluator import Evaluator
+
+
+class RacingEvaluator(Evaluator):
+    """Wrapper that re-evaluates individuals only while their selection is uncertain.
+
+    Running mean and variance of fitness are kept for every individual (for as long as the
+    individual exists, so surviving parents keep their statistics between generations).
+    Fitness of an individual is its mean fitness. After each round, individuals whose
+    confidence interval overlaps the cutoff between the best selected_count individuals
+    and the rest are evaluated once more, until no interval overlaps the cutoff or
+    the individuals reach max_evaluations.
+    Algorithms like EvolutionStrategy with elitism evaluate only the children but select
+    among children and parents, so the best selected_count individuals of each race
+    (the parents of the next generation) are raced again together with the next batch.
+    """
+
+    def __init__(self, evaluator, selected_count, max_evaluations=5, z=1.96,
+                 race_survivors=True):
+        """Initialize the evaluator
+
+        :param evaluator: Evaluator with noisy fitness, e.g. BreezyEvaluator
+        :param selected_count: Number of individuals the algorithm selects,
+                               e.g. parent_count of EvolutionStrategy
+        :param max_evaluations: Maximum number of evaluations of a single individual
+        :param z: Width of confidence intervals in standard errors
+        :param race_survivors: If true, the best selected_count individuals of the previous
+                               batch are raced together with the next batch and their fitness
+                               is updated. Set to false if the algorithm selects only among
+                               the evaluated individuals, e.g. EvolutionStrategy without elitism.
+        """
+        super().__init__(evaluator.input_len, evaluator.output_len)
+        self.evaluator = evaluator
+        self.selected_count = selected_count
+        self.max_evaluations = max_evaluations
+        self.z = z
+        self.race_survivors = race_survivors
+        self.survivors = []
+        # individual -> [evaluation count, mean, sum of squared differences from the mean]
+        self.statistics = weakref.WeakKeyDictionary()
+        self.evaluations = 0
+
+    def evaluate(self, individual):
+        self.batch_evaluate([individual])
+
+    def batch_evaluate(self, individuals):
+        """Race the individuals (and survivors of the previous batch)
+        and sort the individuals by mean fitness in descending order
+        """
+        pool = list(individuals)
+        if self.race_survivors:
+            in_batch = {id(individual) for individual in individuals}
+            pool.extend(survivor for survivor in self.survivors if id(survivor) not in in_batch)
+
+        self._evaluate_once([individual for individual in pool
+                             if individual not in self.statistics])
+
+        while len(pool) > self.selected_count:
+            to_evaluate = self._undecided(pool)
+            if not to_evaluate or not self._evaluate_once(to_evaluate):
+                break
+
+        for individual in pool:
+            if individual in self.statistics:
+                individual.fitness = self.statistics[individual][1]
+            else:
+                individual.fitness = -math.inf
+        if self.race_survivors:
+            pool.sort(key=lambda individual: individual.fitness, reverse=True)
+            self.survivors = pool[:self.selected_count]
+        individuals.sort(key=lambda individual: individual.fitness, reverse=True)
+
+    def _evaluate_once(self, individuals):
+        """Evaluate each individual once more and update its statistics (Welford's algorithm).
+        Return number of successful evaluations.
+        """
+        if not individuals:
+            return 0
+        for individual in individuals:
+            # Fitness of a failed evaluation stays None instead of the previous or parent's one
+            individual.fitness = None
+        # Wrapped evaluator sorts the list it is given
+        self.evaluator.batch_evaluate(list(individuals))
+        self.evaluations += len(individuals)
+        successful = 0
+        for individual in individuals:
+            if individual.fitness is None:
+                continue
+            successful += 1
+            count, mean, squares = self.statistics.get(individual, (0, 0.0, 0.0))
+            count += 1
+            delta = individual.fitness - mean
+            mean += delta / count
+            squares += delta * (individual.fitness - mean)
+            self.statistics[individual] = [count, mean, squares]
+        return successful
+
+    def _undecided(self, individuals):
+        """Return individuals whose confidence interval overlaps the selection cutoff
+        and that can still be evaluated again
+        """
+        statistics = [self.statistics[individual] for individual in individuals
+                      if individual in self.statistics]
+        ranked = sorted((individual for individual in individuals
+                         if individual in self.statistics),
+                        key=lambda individual: self.statistics[individual][1], reverse=True)
+        if len(ranked) <= self.selected_count:
+            return []
+        cutoff = (self.statistics[ranked[self.selected_count - 1]][1]
+                  + self.statistics[ranked[self.selected_count]][1]) / 2
+
+        # Individuals evaluated only once use variance pooled over all the others
+        repeated = [(count, squares) for count, _, squares in statistics if count > 1]
+        pooled_variance = sum(squares for _, squares in repeated) \
+                          / sum(count - 1 for count, _ in repeated) if repeated else None
+
+        undecided = []
+        for individual in ranked:
+            count, mean, squares = self.statistics[individual]
+            if count >= self.max_evaluations:
+                continue
+            variance = squares / (count - 1) if count > 1 else pooled_variance
+            if variance is None or abs(mean - cutoff) <= self.z * math.sqrt(variance / count):
+                undecided.append(individual)
+        return undecided
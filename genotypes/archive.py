@@ -0,0 +1,160 @@
+"""Module containing binary archive format for populations of individuals.
+
+Archive layout (all numbers are little endian):
+    magic           8 bytes, b'SFEVPOP\\0'
+    version         uint32
+    header length   uint32
+    header          UTF-8 JSON object, padded with spaces so data starts at a 64 byte boundary
+    fitness         float64 array with one value per individual
+    genes           (individuals x genes) array of header's dtype, starting at a 64 byte boundary
+
+The header contains individual class name, individual count, gene dtype and length,
+hyperparameters shared by all the individuals and a registry of named functions
+(modules, activation functions) that the hyperparameters refer to.
+Both arrays can be memory mapped, so individuals are only built when they are requested.
+
+Legacy populations saved as a directory with one text file per individual
+are read with PopulationDirectory.
+"""
+import json
+import struct
+from os import listdir
+from os.path import isfile, join
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+
+
+MAGIC = b'SFEVPOP\x00'
+VERSION = 1
+ALIGNMENT = 64
+
+_PREAMBLE = struct.Struct('<8sII')
+
+
+class ArchiveNotSupported(NotImplementedError):
+    """Individuals can't be saved into a population archive"""
+
+
+def save_population(file_path, individuals):
+    """Save given individuals into a single archive file.
+    All individuals have to be of the same class and share the same hyperparameters.
+    """
+    individual_class = type(individuals[0])
+    if individual_class.ARCHIVE_DTYPE is None:
+        raise ArchiveNotSupported(f'{individual_class.__name__} can\'t be archived')
+    hyperparameters = individuals[0].archive_hyperparameters()
+    dtype = np.dtype(individual_class.ARCHIVE_DTYPE).newbyteorder('<')
+    genes = []
+    for individual in individuals:
+        if type(individual) is not individual_class:
+            raise ArchiveNotSupported('All individuals in an archive have to be of the same class')
+        if individual.archive_hyperparameters() != hyperparameters:
+            raise ArchiveNotSupported('All individuals in an archive have to share '
+                                      'hyperparameters')
+        genes.append(individual.archive_genes())
+
+    header = {
+        'class': individual_class.__name__,
+        'count': len(individuals),
+        'dtype': dtype.str,
+        'gene_len': len(genes[0]),
+        'hyperparameters': hyperparameters,
+        'registry': individual_class.archive_registry(hyperparameters),
+    }
+    header_bytes = json.dumps(header).encode('utf-8')
+    header_bytes += b' ' * (-(_PREAMBLE.size + len(header_bytes)) % ALIGNMENT)
+
+    fitness = np.array([individual.fitness for individual in individuals], dtype='<f8')
+    with open(file_path, 'wb') as archive_file:
+        archive_file.write(_PREAMBLE.pack(MAGIC, VERSION, len(header_bytes)))
+        archive_file.write(header_bytes)
+        archive_file.write(fitness.tobytes())
+        archive_file.write(b'\x00' * (-fitness.nbytes % ALIGNMENT))
+        archive_file.write(np.array(genes, dtype=dtype).tobytes())
+
+
+class PopulationArchive:
+    """Read-only, lazily loaded population archive.
+    Fitness values and genes are memory mapped, individuals are built on indexing.
+    """
+
+    def __init__(self, file_path, individual_class):
+        """Open the archive
+
+        :param file_path: path to the archive file
+        :param individual_class: class of the individuals stored in the archive
+        """
+        with open(file_path, 'rb') as archive_file:
+            magic, version, header_len = _PREAMBLE.unpack(archive_file.read(_PREAMBLE.size))
+            if magic != MAGIC:
+                raise ValueError(f'{file_path} is not a population archive')
+            if version > VERSION:
+                raise ValueError(f'Unsupported population archive version {version}')
+            header = json.loads(archive_file.read(header_len).decode('utf-8'))
+
+        if header['class'] != individual_class.__name__:
+            raise ValueError(f'Archive contains {header["class"]} individuals, '
+                             f'not {individual_class.__name__}')
+
+        self.individual_class = individual_class
+        self.header = header
+        self.hyperparameters = individual_class.from_archive_hyperparameters(
+            header['hyperparameters'], header['registry'])
+
+        count = header['count']
+        offset = _PREAMBLE.size + header_len
+        if count:
+            self.fitness = np.memmap(file_path, dtype='<f8', mode='r', offset=offset,
+                                     shape=(count,))
+            offset += 8 * count + (-8 * count % ALIGNMENT)
+            self.genes = np.memmap(file_path, dtype=header['dtype'], mode='r', offset=offset,
+                                   shape=(count, header['gene_len']))
+        else:
+            self.fitness = np.empty(0)
+            self.genes = np.empty((0, header['gene_len']), dtype=header['dtype'])
+
+    def __len__(self):
+        return self.header['count']
+
+    def __getitem__(self, index):
+        """Build and return individual on given index"""
+        individual = self.individual_class.from_archive(self.hyperparameters, self.genes[index])
+        individual.fitness = float(self.fitness[index])
+        return individual
+
+
+class PopulationDirectory:
+    """Read-only, lazily loaded population saved as a directory of individual files.
+    Files are only listed on creation and parsed when requested,
+    or in the background by a pool of workers.
+    """
+
+    def __init__(self, population_path, individual_class, workers=0, processes=False):
+        """Index the directory
+
+        :param population_path: path to a directory containing saved individuals
+        :param individual_class: class of the saved individuals
+        :param workers: Number of workers parsing the files in the background.
+                        If 0, files are parsed on indexing.
+        :param processes: If true, workers are processes instead of threads
+        """
+        self.individual_class = individual_class
+        self.files = sorted([join(population_path, f) for f in listdir(population_path)
+                             if isfile(join(population_path, f))])
+        self.futures = None
+        self.executor = None
+        if workers and self.files:
+            executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+            self.executor = executor_class(max_workers=workers)
+            self.futures = [self.executor.submit(individual_class.from_file, f)
+                            for f in self.files]
+            self.executor.shutdown(wait=False)
+
+    def __len__(self):
+        return len(self.files)
+
+    def __getitem__(self, index):
+        """Parse (or wait for a worker to parse) and return individual on given index"""
+        if self.futures is not None:
+            return self.futures[index].result()
+        return self.individual_class.from_file(self.files[index])
@@ -1,24 +1,39 @@
 """Module containing Cartesian Genetic Programming model of an Individual"""
 import random
+from array import array
 from math import pi
+import numpy as np
 from ..individual import Individual
+from .chromosome import CGPChromosome
+from .compiler import compile_plan
+from .incremental import IncrementalEvaluation
 from .modules import *
+from .plan import ExecutionPlan
+from .simplify import simplify_plan
 
 
 class CGPIndividual(Individual):
     """A CGP individual"""
 
+    ARCHIVE_DTYPE = 'i4'
+
     def __init__(self, input_len, grid_size, output_len, constant_len,
                  constants=(0, 1, 2, 3, 4, 5, 6, 7, 8, 9, pi),
                  modules=(module_sum, module_difference, module_product,
                           module_quotient, module_sine, module_cosine,
-                          module_negative, min, max), chromosome=None):
+                          module_negative, min, max), chromosome=None, compiled=False,
+                 simplify=False):
         """Initialize CGPIndividual.
 
         :param input_len: number of inputs to the individual
         :param grid_size: tuple containing width and height of module grid
         :param output_len: number of outputs from the individual
         :param modules: list of functions - modules
+        :param compiled: If true, active modules are compiled into a single Python function.
+                         Falls back to the interpreter if some module can't be inlined.
+        :param simplify: If true, execution plan is simplified by constant folding, algebraic
+                         identities and elimination of duplicate modules. Outputs and genes
+                         are not changed.
         """
         super().__init__()
 
@@ -30,6 +45,11 @@ class CGPIndividual(Individual):
         self.constants = constants
         self.modules = modules
         self.modules_len = len(modules)
+        self.compiled = compiled
+        self.simplify = simplify
+        self._plan = None
+        self._program = None
+        self._incremental = None
 
         if chromosome is None:
             self.chromosome = [0] * (constant_len + output_len +
@@ -44,56 +64,197 @@ class CGPIndividual(Individual):
 
 
 
+    @property
+    def chromosome(self):
+        """Array of genes. Changing it invalidates the cached execution plan."""
+        return self._chromosome
+
+    @chromosome.setter
+    def chromosome(self, chromosome):
+        self._chromosome = CGPChromosome(chromosome, owner=self)
+        self.chromosome_changed()
+
+
+    def chromosome_changed(self):
+        """Recompute active modules and invalidate everything computed from the chromosome"""
+        first_module = self.input_len + self.constant_len
+        self._references = array('i', bytes(4 * (first_module +
+                                                 self.grid_width * self.grid_height)))
+        self._active_modules = set()
+        for output in self._chromosome[len(self._chromosome)-self.output_len:]:
+            self._reference(output)
+        self._plan = None
+        self._program = None
+
+
+    def gene_changed(self, index, old_value, new_value):
+        """Update active modules after a single gene has changed.
+        Only the part of the graph that gets (de)activated is visited.
+        """
+        if index < 0:
+            index += len(self._chromosome)
+        if old_value == new_value:
+            return
+
+        active = self.is_active_gene(index)
+        if index >= len(self._chromosome) - self.output_len or (
+                active and index >= self.constant_len and (index - self.constant_len) % 3 != 2):
+            # Output or an input of an active module has changed
+            self._reference(new_value)
+            self._release(old_value)
+
+        if active:
+            self._plan = None
+            self._program = None
+
+
+    def _reference(self, position):
+        """Add a reference to a value at given position, activating modules as needed"""
+        references = self._references
+        first_module = self.input_len + self.constant_len
+        to_reference = [position]
+        while to_reference:
+            position = to_reference.pop()
+            references[position] += 1
+            if references[position] == 1 and position >= first_module:
+                self._active_modules.add(position)
+                index = self.module_index(position)
+                to_reference.extend(self._chromosome[index:index+2])
+
+
+    def _release(self, position):
+        """Remove a reference to a value at given position, deactivating modules as needed"""
+        references = self._references
+        first_module = self.input_len + self.constant_len
+        to_release = [position]
+        while to_release:
+            position = to_release.pop()
+            references[position] -= 1
+            if references[position] == 0 and position >= first_module:
+                self._active_modules.discard(position)
+                index = self.module_index(position)
+                to_release.extend(self._chromosome[index:index+2])
+
+
+    @property
+    def active_modules(self):
+        """Set of output indices of modules that contribute to the outputs"""
+        return self._active_modules
+
+
+    def is_active_gene(self, index):
+        """Check if gene on given index contributes to the outputs"""
+        if index >= len(self._chromosome) - self.output_len:
+            return True
+        if index < self.constant_len:
+            return self._references[self.input_len + index] > 0
+        first_module = self.input_len + self.constant_len
+        return self._references[first_module + (index - self.constant_len) // 3] > 0
+
+
+    def active_genes(self):
+        """Return a list of indices of genes that contribute to the outputs"""
+        genes = [i for i in range(self.constant_len) if self._references[self.input_len + i]]
+        for output_index in self._active_modules:
+            index = self.module_index(output_index)
+            genes.extend((index, index + 1, index + 2))
+        genes.extend(range(len(self._chromosome) - self.output_len, len(self._chromosome)))
+        return genes
+
+
+    @property
+    def plan(self):
+        """Execution plan for the current chromosome, built on first use"""
+        if self._plan is None:
+            plan = ExecutionPlan.from_individual(self)
+            self._plan = simplify_plan(plan) if self.simplify else plan
+        return self._plan
+
+
+    @property
+    def program(self):
+        """Function equivalent to the execution plan, compiled on first use"""
+        if self._program is None:
+            self._program = compile_plan(self.plan) or self.plan.run
+        return self._program
+
+
     def evaluate(self, inputs):
         """Evaluate given inputs and return outputs"""
         if len(inputs) != self.input_len:
             raise ValueError('Bad input length for inputs {}, was expecting length {}.'
                              .format(inputs, self.input_len))
 
-        module_outputs = {}
-        for i, input_value in enumerate(inputs):
-            module_outputs[i] = input_value
+        if self.compiled:
+            return self.program(inputs)
+        return self.plan.run(inputs)
+
+
+    def evaluate_incremental(self, inputs):
+        """Evaluate given inputs reusing module values from the previous call.
+        Only modules downstream of changed inputs are recomputed.
+        """
+        if len(inputs) != self.input_len:
+            raise ValueError('Bad input length for inputs {}, was expecting length {}.'
+                             .format(inputs, self.input_len))
+
+        plan = self.plan
+        if self._incremental is None or self._incremental.plan is not plan:
+            self._incremental = IncrementalEvaluation(plan)
+        return self._incremental.run(inputs)
+
+
+    @property
+    def incremental_stats(self):
+        """Tuple of (reused, recomputed) module counts from the last incremental evaluation"""
+        if self._incremental is None:
+            return 0, 0
+        return self._incremental.reused, self._incremental.recomputed
+
 
-        for i in range(self.input_len, self.input_len + self.constant_len):
-            module_outputs[i] = self.constants[self.chromosome[i-self.input_len]]
+    def evaluate_batch(self, inputs):
+        """Evaluate a (samples x inputs) matrix and return (samples x outputs) array"""
+        if len(inputs[0]) != self.input_len:
+            raise ValueError('Bad input length {}, was expecting length {}.'
+                             .format(len(inputs[0]), self.input_len))
 
-        # Find all the modules that need to be evaluated
+        return self.plan.run_batch(inputs)
 
-        to_evaluate = []
-        for output in self.chromosome[-self.output_len:]:
-            if output >= self.input_len + self.constant_len:
-                to_evaluate.append(output)
 
-        i = 0
-        while i < len(to_evaluate):
-            output_index = to_evaluate[i]
-            module_index = self.module_index(output_index)
-            module_dependencies = self.chromosome[module_index:module_index+2]
-            for dependency in module_dependencies:
-                if ((dependency >= self.input_len + self.constant_len)
-                        and (dependency not in to_evaluate)):
-                    to_evaluate.append(dependency)
-            i += 1
+    def fingerprint(self):
+        """Return the execution plan - active modules, used constants and outputs"""
+        return self.plan
 
-        # Evaluate all modules that need to be evaluated
 
-        to_evaluate.sort()
+    def copy(self):
+        """Return a copy of self.
+        Only the genes are duplicated, hyperparameters and cached plan are shared.
+        """
+        clone = self.__class__.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+        clone._chromosome = self._chromosome.copy(owner=clone)
+        clone._references = array('i', self._references)
+        clone._active_modules = set(self._active_modules)
+        clone._incremental = None
+        return clone
+
 
-        for output_index in to_evaluate:
-            module_index = self.module_index(output_index)
-            input1 = module_outputs[self.chromosome[module_index + 0]]
-            input2 = module_outputs[self.chromosome[module_index + 1]]
-            module = self.modules[self.chromosome[module_index + 2]]
+    def __deepcopy__(self, memo):
+        return self.copy()
 
-            module_outputs[output_index] = module(input1, input2)
 
+    def __getstate__(self):
+        """Pack the genes into bytes and drop the generated function which can't be pickled"""
+        state = self.__dict__.copy()
+        state['_chromosome'] = self._chromosome.tobytes()
+        state['_program'] = None
+        state['_incremental'] = None
+        return state
 
-        # Compose final outputs
-        outputs = []
-        for output in self.chromosome[-self.output_len:]:
-            outputs.append(module_outputs[output])
 
-        return outputs
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._chromosome = CGPChromosome.from_bytes(state['_chromosome'], owner=self)
 
 
     def to_file(self, file_path):
@@ -127,11 +288,65 @@ class CGPIndividual(Individual):
         return cgp
 
 
+    def archive_hyperparameters(self):
+        """Return JSON serializable hyperparameters for population archives"""
+        module_names = []
+        for module in self.modules:
+            if MODULES.get(module.__name__) is not module:
+                raise ValueError(f'Module {module.__name__} is not registered in MODULES')
+            module_names.append(module.__name__)
+
+        return {
+            'input_len': self.input_len,
+            'grid_size': [self.grid_width, self.grid_height],
+            'output_len': self.output_len,
+            'constant_len': self.constant_len,
+            'constants': list(self.constants),
+            'modules': module_names,
+            'compiled': self.compiled,
+            'simplify': self.simplify,
+        }
+
+
+    def archive_genes(self):
+        """Return genes as an int32 array for population archives"""
+        return np.frombuffer(self._chromosome, dtype=np.intc)
+
+
+    @staticmethod
+    def archive_registry(hyperparameters):
+        """Return names of modules used by archived hyperparameters"""
+        return sorted(set(hyperparameters['modules']))
+
+
+    @staticmethod
+    def from_archive_hyperparameters(hyperparameters, registry):
+        """Return constructor hyperparameters from archived ones"""
+        unknown = [name for name in registry if name not in MODULES]
+        if unknown:
+            raise ValueError(f'Archive uses modules that are not registered: {unknown}')
+
+        hyperparameters = dict(hyperparameters)
+        hyperparameters['grid_size'] = tuple(hyperparameters['grid_size'])
+        hyperparameters['constants'] = tuple(hyperparameters['constants'])
+        hyperparameters['modules'] = tuple(MODULES[name] for name in hyperparameters['modules'])
+        return hyperparameters
+
+
+    @staticmethod
+    def from_archive(hyperparameters, genes):
+        """Return CGPIndividual built from hyperparameters and archived genes"""
+        chromosome = CGPChromosome.from_bytes(np.ascontiguousarray(genes, dtype=np.intc))
+        return CGPIndividual(**hyperparameters, chromosome=chromosome)
+
+
     def randomize(self):
         """Randomize the chromosome of this individual"""
+        chromosome = [0] * len(self.chromosome)
+
         # Randomize constants
         for i in range(self.constant_len):
-            self.chromosome[i] = random.randrange(len(self.constants))
+            chromosome[i] = random.randrange(len(self.constants))
 
         # Randomize layer by layer ensuring we end up with a valid CGP individual
         for layer in range(self.grid_width):
@@ -140,15 +355,17 @@ class CGPIndividual(Individual):
 
             for module in range(self.grid_height):
                 module_index = 3 * (self.grid_height * layer + module) + self.constant_len
-                self.chromosome[module_index + 0] = random.randrange(0, valid_input_len)
-                self.chromosome[module_index + 1] = random.randrange(0, valid_input_len)
-                self.chromosome[module_index + 2] = random.randrange(0, self.modules_len)
+                chromosome[module_index + 0] = random.randrange(0, valid_input_len)
+                chromosome[module_index + 1] = random.randrange(0, valid_input_len)
+                chromosome[module_index + 2] = random.randrange(0, self.modules_len)
 
         # Randomize outputs
         valid_outputs_len = self.input_len + self.constant_len + self.grid_width * self.grid_height
         size = self.constant_len + self.grid_width * self.grid_height * 3 + self.output_len
         for i in range(size - self.output_len, size):
-            self.chromosome[i] = random.randrange(0, valid_outputs_len)
+            chromosome[i] = random.randrange(0, valid_outputs_len)
+
+        self.chromosome = chromosome
 
 
     def module_index(self, output_index):
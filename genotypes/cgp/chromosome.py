@@ -0,0 +1,44 @@
+"""Module containing chromosome container for CGPIndividual"""
+from array import array
+
+
+class CGPChromosome(array):
+    """A compact array of integer genes that notifies its owner whenever a gene is changed.
+    Owner is expected to implement gene_changed and chromosome_changed methods.
+    """
+
+    __slots__ = ('owner',)
+
+    TYPECODE = 'i'
+
+    def __new__(cls, genes=(), owner=None):
+        """Create the chromosome
+
+        :param genes: iterable of integer genes
+        :param owner: object that is notified about the changes
+        """
+        chromosome = super().__new__(cls, cls.TYPECODE, genes)
+        chromosome.owner = owner
+        return chromosome
+
+    def __setitem__(self, index, value):
+        if self.owner is None:
+            super().__setitem__(index, value)
+        elif isinstance(index, slice):
+            super().__setitem__(index, value)
+            self.owner.chromosome_changed()
+        else:
+            old_value = self[index]
+            super().__setitem__(index, value)
+            self.owner.gene_changed(index, old_value, value)
+
+    @classmethod
+    def from_bytes(cls, data, owner=None):
+        """Create the chromosome from a buffer of packed genes"""
+        chromosome = cls(owner=owner)
+        chromosome.frombytes(memoryview(data).cast('B'))
+        return chromosome
+
+    def copy(self, owner=None):
+        """Return a copy of the genes with given owner"""
+        return self.from_bytes(self, owner)
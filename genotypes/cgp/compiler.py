@@ -0,0 +1,76 @@
+"""Module containing code generation backend for CGP individuals.
+
+Active part of an individual (its ExecutionPlan) is turned into the source of a single
+Python function with constants and module bodies inlined. Generated functions are cached
+by the plan, so individuals sharing the same active genes share the same function.
+"""
+import math
+from functools import lru_cache
+from .modules import *
+
+
+# Python expressions equivalent to known module functions
+INLINE_MODULES = {
+    module_sum: '{0} + {1}',
+    module_difference: '{0} - {1}',
+    module_product: '{0} * {1}',
+    module_quotient: '{0} / {1} if abs({1}) > PROTECTED_DIVISION_EPSILON else {0}',
+    module_sine: 'sin({0})',
+    module_cosine: 'cos({0})',
+    module_negative: '-{0}',
+    min: 'min({0}, {1})',
+    max: 'max({0}, {1})',
+}
+
+CACHE_SIZE = 1024
+
+
+def compile_plan(plan):
+    """Return a function equivalent to plan.run.
+    None is returned if the plan uses modules that can't be inlined.
+
+    :param plan: ExecutionPlan of a CGPIndividual
+    """
+    # Constants are part of the key by repr, so that 1, 1.0 and True don't share a function
+    return _compile(plan, tuple(repr(constant) for constant in plan.constants))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _compile(plan, constants_key):
+    """Generate and compile the source for given plan"""
+    if any(module not in INLINE_MODULES for module, _, _ in plan.steps):
+        return None
+
+    namespace = {
+        'sin': math.sin,
+        'cos': math.cos,
+        'PROTECTED_DIVISION_EPSILON': PROTECTED_DIVISION_EPSILON,
+    }
+    names = [f'i{slot}' for slot in range(plan.input_len)]
+    for i, constant in enumerate(plan.constants):
+        if _is_literal(constant):
+            names.append(f'({constant!r})')
+        else:
+            namespace[f'c{i}'] = constant
+            names.append(f'c{i}')
+
+    used_inputs = {slot for _, input1, input2 in plan.steps for slot in (input1, input2)}
+    used_inputs.update(plan.outputs)
+    lines = [f'    i{slot} = inputs[{slot}]'
+             for slot in sorted(used_inputs) if slot < plan.input_len]
+    for slot, (module, input1, input2) in enumerate(plan.steps, start=plan.first_step_slot):
+        names.append(f'v{slot}')
+        lines.append(f'    v{slot} = ' + INLINE_MODULES[module].format(names[input1],
+                                                                       names[input2]))
+    lines.append('    return [' + ', '.join(names[output] for output in plan.outputs) + ']')
+
+    source = 'def cgp_program(inputs):\n' + '\n'.join(lines) + '\n'
+    exec(compile(source, '<cgp_program>', 'exec'), namespace)  # pylint: disable=exec-used
+    function = namespace['cgp_program']
+    function.source = source
+    return function
+
+
+def _is_literal(constant):
+    """Check if constant can be written into the source by its repr"""
+    return (type(constant) in (int, float)) and math.isfinite(constant)
@@ -0,0 +1,84 @@
+"""Module containing incremental evaluation of CGP execution plans"""
+import math
+
+
+class IncrementalEvaluation:
+    """Evaluation of an ExecutionPlan that keeps all the values between calls.
+    Only steps that depend on inputs that have changed since the previous call are recomputed.
+    Inputs are compared by type and sign of zero too, so outputs are the same as those of
+    a full evaluation.
+    """
+
+    def __init__(self, plan):
+        """Initialize the evaluation
+
+        :param plan: ExecutionPlan to evaluate
+        """
+        self.plan = plan
+        self.values = None
+        self.reused = 0
+        self.recomputed = 0
+
+        # Bitmask of input slots each step depends on
+        first_step_slot = plan.first_step_slot
+        inputs_masks = [1 << slot for slot in range(plan.input_len)]
+        inputs_masks.extend([0] * len(plan.constants))
+        for _, input1, input2 in plan.steps:
+            inputs_masks.append(inputs_masks[input1] | inputs_masks[input2])
+
+        # Bitmask of steps that depend on each input
+        self.dependents = [0] * plan.input_len
+        for step, inputs_mask in enumerate(inputs_masks[first_step_slot:]):
+            while inputs_mask:
+                lowest = inputs_mask & -inputs_mask
+                self.dependents[lowest.bit_length() - 1] |= 1 << step
+                inputs_mask ^= lowest
+
+    def run(self, inputs):
+        """Run the plan on given inputs and return outputs"""
+        plan = self.plan
+        if self.values is None:
+            values = list(inputs)
+            values.extend(plan.constants)
+            append = values.append
+            for module, input1, input2 in plan.steps:
+                append(module(values[input1], values[input2]))
+            self.values = values
+            self.reused = 0
+            self.recomputed = len(plan.steps)
+            return [values[output] for output in plan.outputs]
+
+        values = self.values
+        dependents = self.dependents
+        to_compute = 0
+        for slot, value in enumerate(inputs):
+            if not _same(value, values[slot]):
+                to_compute |= dependents[slot]
+                values[slot] = value
+
+        recomputed = 0
+        steps = plan.steps
+        first_step_slot = plan.first_step_slot
+        try:
+            while to_compute:
+                lowest = to_compute & -to_compute
+                step = lowest.bit_length() - 1
+                module, input1, input2 = steps[step]
+                values[first_step_slot + step] = module(values[input1], values[input2])
+                to_compute ^= lowest
+                recomputed += 1
+        except BaseException:
+            # Values are only partially updated, the next call evaluates everything again
+            self.values = None
+            raise
+
+        self.reused = len(steps) - recomputed
+        self.recomputed = recomputed
+        return [values[output] for output in plan.outputs]
+
+
+def _same(value, old):
+    """Check if value can be reused in place of old value"""
+    if type(value) is not type(old) or value != old:
+        return False
+    return value != 0 or math.copysign(1, value) == math.copysign(1, old)
@@ -1,5 +1,6 @@
 """CGP modules"""
 import math
+import numpy as np
 
 
 PROTECTED_DIVISION_EPSILON = 1e-5
@@ -38,3 +39,40 @@ def module_cosine(a, b):
 def module_negative(a, b):
     """Module function - negative first argument"""
     return -a
+
+
+# Modules that can be referred to by name, e.g. in population archives
+MODULES = {module.__name__: module for module in (module_sum, module_difference, module_product,
+                                                  module_quotient, module_sine, module_cosine,
+                                                  module_negative, min, max)}
+
+
+def vector_quotient(a, b):
+    """Vectorized module function - quotient"""
+    protected = np.abs(b) > PROTECTED_DIVISION_EPSILON
+    return np.where(protected, a / np.where(protected, b, 1), a)
+
+
+# NumPy versions of module functions working on whole columns of samples.
+# min and max follow Python semantics - the first argument is kept unless the second one wins.
+VECTORIZED_MODULES = {
+    module_sum: np.add,
+    module_difference: np.subtract,
+    module_product: np.multiply,
+    module_quotient: vector_quotient,
+    module_sine: lambda a, b: np.sin(a),
+    module_cosine: lambda a, b: np.cos(a),
+    module_negative: lambda a, b: np.negative(a),
+    min: lambda a, b: np.where(b < a, b, a),
+    max: lambda a, b: np.where(b > a, b, a),
+}
+
+
+def vectorize(module):
+    """Return a vectorized version of given module function.
+    Unknown modules are applied sample by sample.
+    """
+    try:
+        return VECTORIZED_MODULES[module]
+    except KeyError:
+        return lambda a, b: np.frompyfunc(module, 2, 1)(a, b).astype(float)
@@ -0,0 +1,74 @@
+"""Module containing compiled execution plan of a CGP individual"""
+from collections import namedtuple
+import numpy as np
+from .modules import vectorize
+
+
+class ExecutionPlan(namedtuple('ExecutionPlan', ('input_len', 'constants', 'steps', 'outputs'))):
+    """Flat, pre-ordered evaluation program of CGPIndividual's active modules.
+
+    Values are kept in slots. First come the inputs, then the constants and
+    then one slot for every step, in the order the steps are executed.
+
+    :input_len: number of inputs
+    :constants: tuple of values of used constants
+    :steps: tuple of (module, input1 slot, input2 slot) tuples in evaluation order
+    :outputs: tuple of slots that make up the outputs
+    """
+
+    __slots__ = ()
+
+    @staticmethod
+    def from_individual(individual):
+        """Build an execution plan for the current chromosome of given CGPIndividual"""
+        chromosome = individual.chromosome
+        outputs = chromosome[len(chromosome)-individual.output_len:]
+
+        # Only constants that are used get a slot
+        slots = list(range(individual.input_len))
+        slots.extend([None] * (individual.constant_len +
+                               individual.grid_width * individual.grid_height))
+        constants = []
+        for i, gene in enumerate(chromosome[:individual.constant_len]):
+            if individual.is_active_gene(i):
+                slots[individual.input_len + i] = individual.input_len + len(constants)
+                constants.append(individual.constants[gene])
+
+        # Modules only depend on modules with lower output index, so sorted order is valid
+        steps = []
+        for current in sorted(individual.active_modules):
+            index = individual.module_index(current)
+            steps.append((individual.modules[chromosome[index + 2]],
+                          slots[chromosome[index + 0]], slots[chromosome[index + 1]]))
+            slots[current] = individual.input_len + len(constants) + len(steps) - 1
+
+        return ExecutionPlan(individual.input_len, tuple(constants), tuple(steps),
+                             tuple(slots[output] for output in outputs))
+
+    @property
+    def first_step_slot(self):
+        """Slot of the first step's output"""
+        return self.input_len + len(self.constants)
+
+    def run(self, inputs):
+        """Run the plan on given inputs and return outputs"""
+        values = list(inputs)
+        values.extend(self.constants)
+        append = values.append
+        for module, input1, input2 in self.steps:
+            append(module(values[input1], values[input2]))
+        return [values[output] for output in self.outputs]
+
+    def run_batch(self, inputs):
+        """Run the plan on a (samples x inputs) matrix and return (samples x outputs) array.
+        Every step is evaluated once for all the samples.
+        """
+        inputs = np.asarray(inputs, dtype=float)
+        sample_count = len(inputs)
+        values = list(inputs.T)
+        values.extend(np.full(sample_count, constant, dtype=float) for constant in self.constants)
+        append = values.append
+        with np.errstate(all='ignore'):
+            for module, input1, input2 in self.steps:
+                append(vectorize(module)(values[input1], values[input2]))
+        return np.column_stack([values[output] for output in self.outputs])
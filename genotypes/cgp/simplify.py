@@ -0,0 +1,177 @@
+"""Module containing simplification pass for CGP execution plans.
+
+Simplification produces an equivalent, usually shorter, ExecutionPlan:
+ - modules whose arguments are all constants are folded into constants
+ - algebraic identities of the modules in modules.py are applied (x - 0, x * 1, -(-x), ...)
+ - modules with the same function and the same arguments are evaluated only once
+ - modules that no longer contribute to the outputs are removed
+Only modules from modules.py and builtin min and max are simplified, others are kept as they are.
+"""
+from .modules import *
+from .plan import ExecutionPlan
+
+
+# Modules that ignore their second argument
+UNARY_MODULES = (module_sine, module_cosine, module_negative)
+
+# Modules that are pure and can be folded or rewritten
+KNOWN_MODULES = (module_sum, module_difference, module_product, module_quotient,
+                 module_sine, module_cosine, module_negative, min, max)
+
+
+def simplify_plan(plan, assume_finite=False):
+    """Return simplified version of given ExecutionPlan.
+    By default, the simplified plan returns exactly the same outputs for all inputs.
+    Modules whose results are not used are skipped, so their errors (e.g. sine of infinity)
+    are not raised.
+
+    :param plan: ExecutionPlan to simplify
+    :param assume_finite: If true, identities that hold only for finite values
+                          (x - x = 0 and x * 0 = 0) and for x other than -0.0 (x + 0 = x)
+                          are applied too. Outputs can change for infinite or nan inputs.
+    """
+    # Values are referenced as ('input', slot), ('constant', value) or ('step', step index)
+    references = [('input', slot) for slot in range(plan.input_len)]
+    references.extend(('constant', constant) for constant in plan.constants)
+    steps = []
+    known_steps = {}
+    for module, input1, input2 in plan.steps:
+        references.append(_simplify_step(module, references[input1], references[input2],
+                                         steps, known_steps, assume_finite))
+
+    return _build_plan(plan.input_len, steps, [references[output] for output in plan.outputs])
+
+
+def _simplify_step(module, first, second, steps, known_steps, assume_finite):
+    """Return a reference to a value equivalent to module(first, second).
+    New step is appended to steps only if it can't be avoided.
+    """
+    if module not in KNOWN_MODULES:
+        return _add_step((module, first, second), steps, known_steps)
+
+    if module in UNARY_MODULES:
+        second = None
+
+    # Constant folding
+    if first[0] == 'constant' and (second is None or second[0] == 'constant'):
+        try:
+            return ('constant', module(first[1], second[1] if second else 0))
+        except (ArithmeticError, ValueError):
+            # Keep the error for evaluation time
+            pass
+
+    simplified = _apply_identities(module, first, second, steps, assume_finite)
+    if simplified is not None:
+        return simplified
+
+    if module in (module_sum, module_product) and repr(second) < repr(first):
+        # Commutative modules - same arguments in different order are the same step
+        first, second = second, first
+    return _add_step((module, first, second), steps, known_steps)
+
+
+def _apply_identities(module, first, second, steps, assume_finite):
+    """Return reference to a simpler equivalent value or None if no identity applies"""
+    second_constant = second[1] if second and second[0] == 'constant' else None
+    first_constant = first[1] if first[0] == 'constant' else None
+
+    if module is module_negative and first[0] == 'step' and steps[first[1]][0] is module_negative:
+        return steps[first[1]][1]
+    if module in (min, max) and first == second:
+        return first
+    if module is module_sum and assume_finite:
+        # -0.0 + 0 is 0.0
+        if _equals(second_constant, 0):
+            return first
+        if _equals(first_constant, 0):
+            return second
+    if module is module_difference:
+        if _equals(second_constant, 0):
+            return first
+        if assume_finite and first == second:
+            return ('constant', 0)
+    if module is module_product:
+        if _equals(second_constant, 1):
+            return first
+        if _equals(first_constant, 1):
+            return second
+        if assume_finite and (_equals(first_constant, 0) or _equals(second_constant, 0)):
+            return ('constant', 0)
+    if module is module_quotient and second_constant is not None:
+        try:
+            if abs(second_constant) <= PROTECTED_DIVISION_EPSILON:
+                return first
+        except TypeError:
+            pass
+    return None
+
+
+def _equals(constant, value):
+    """Check if constant is an integer equal to value.
+    Float constants are skipped, they would turn integer arguments into floats.
+    """
+    return type(constant) is int and constant == value
+
+
+def _add_step(step, steps, known_steps):
+    """Append step unless the same step already exists and return reference to it"""
+    # 0 == 0.0 == -0.0, constants are told apart by type and repr
+    key = step[:1] + tuple(('constant', type(reference[1]), repr(reference[1]))
+                           if reference is not None and reference[0] == 'constant' else reference
+                           for reference in step[1:])
+    if key in known_steps:
+        return known_steps[key]
+
+    steps.append(step)
+    known_steps[key] = ('step', len(steps) - 1)
+    return known_steps[key]
+
+
+def _build_plan(input_len, steps, outputs):
+    """Build an ExecutionPlan containing only the steps that outputs depend on"""
+    used = [False] * len(steps)
+    to_check = [reference[1] for reference in outputs if reference[0] == 'step']
+    while to_check:
+        step = to_check.pop()
+        if used[step]:
+            continue
+        used[step] = True
+        to_check.extend(reference[1] for reference in steps[step][1:]
+                        if reference is not None and reference[0] == 'step')
+
+    constants = []
+    constant_slots = {}
+
+    def constant_slot(value):
+        key = (type(value), repr(value))
+        if key not in constant_slots:
+            constant_slots[key] = len(constants)
+            constants.append(value)
+        return constant_slots[key]
+
+    # Constants have to be known before slots of the steps can be assigned
+    for reference in outputs + [reference for step, is_used in zip(steps, used) if is_used
+                                for reference in step[1:]]:
+        if reference is not None and reference[0] == 'constant':
+            constant_slot(reference[1])
+
+    first_step_slot = input_len + len(constants)
+    step_slots = {}
+
+    def slot(reference):
+        kind, value = reference
+        if kind == 'input':
+            return value
+        if kind == 'constant':
+            return input_len + constant_slot(value)
+        return step_slots[value]
+
+    new_steps = []
+    for step, (module, first, second) in enumerate(steps):
+        if used[step]:
+            first_slot = slot(first)
+            new_steps.append((module, first_slot, first_slot if second is None else slot(second)))
+            step_slots[step] = first_step_slot + len(new_steps) - 1
+
+    return ExecutionPlan(input_len, tuple(constants), tuple(new_steps),
+                         tuple(slot(output) for output in outputs))
@@ -1,8 +1,9 @@
 """Module containing abstract class for learning models (individuals) and their factories"""
-from os import listdir
-from os.path import isfile, join
+from os.path import isfile
 from abc import ABC, abstractmethod
 from copy import deepcopy
+import numpy as np
+from .archive import ArchiveNotSupported, PopulationArchive, PopulationDirectory
 
 
 class Individual(ABC):
@@ -16,6 +17,27 @@ class Individual(ABC):
     def evaluate(self, inputs):
         """Evaluate given imputs and return the outputs"""
 
+    def evaluate_batch(self, inputs):
+        """Evaluate a (samples x inputs) matrix and return (samples x outputs) array.
+        Individuals that can evaluate many samples at once should override this.
+        """
+        return np.array([self.evaluate(sample) for sample in inputs])
+
+    @staticmethod
+    def evaluate_population(individuals, inputs):
+        """Evaluate a (samples x inputs) matrix on each of given individuals
+        and return (individuals x samples x outputs) array.
+        Individual classes that can evaluate many individuals at once should override this.
+        """
+        return np.array([individual.evaluate_batch(inputs) for individual in individuals])
+
+    def fingerprint(self):
+        """Return a hashable fingerprint of the phenotype.
+        Individuals with equal fingerprints must behave the same.
+        None means the individual has no fingerprint.
+        """
+        return None
+
     @abstractmethod
     def to_file(self, file_path):
         """Save the individual to a file"""
@@ -25,6 +47,34 @@ class Individual(ABC):
     def from_file(file_path):
         """Load the individual from a file"""
 
+    # NumPy dtype of genes in population archives
+    ARCHIVE_DTYPE = None
+
+    def archive_hyperparameters(self):
+        """Return JSON serializable hyperparameters for population archives.
+        Functions should be referred to by their registered names.
+        """
+        raise ArchiveNotSupported(f'{self.__class__.__name__} can\'t be archived')
+
+    def archive_genes(self):
+        """Return one dimensional array of genes for population archives"""
+        raise ArchiveNotSupported(f'{self.__class__.__name__} can\'t be archived')
+
+    @staticmethod
+    def archive_registry(hyperparameters):
+        """Return a list of names of registered functions that archived hyperparameters use"""
+        return []
+
+    @classmethod
+    def from_archive_hyperparameters(cls, hyperparameters, registry):
+        """Return constructor hyperparameters from archived ones, resolving function names"""
+        raise ArchiveNotSupported(f'{cls.__name__} can\'t be archived')
+
+    @classmethod
+    def from_archive(cls, hyperparameters, genes):
+        """Return an individual built from hyperparameters and archived genes"""
+        raise ArchiveNotSupported(f'{cls.__name__} can\'t be archived')
+
     def copy(self):
         """Return a copy of self"""
         return deepcopy(self)
@@ -48,18 +98,28 @@ class Individual(ABC):
 class IndividualGenerator():
     """Individual factory class"""
 
-    def __init__(self, individual_class, hyperparameters, population_path=None):
+    def __init__(self, individual_class, hyperparameters, population_path=None,
+                 loader_workers=0, loader_processes=False):
         """Initialize the generator
 
         :individual_class: class of an Individual that this generator will create
         :hyperparameters: hyperparamters for the generated individuals
-        :population_path: path to a directory containing saved individuals
+        :population_path: path to a population archive file
+                          or a directory containing saved individuals
+        :loader_workers: number of workers parsing saved individuals from a directory
+                         in the background. If 0, individuals are parsed when generated.
+        :loader_processes: if true, loader workers are processes instead of threads
         """
         self.individual_class = individual_class
         self.hyperparameters = hyperparameters
         self.population = []
+        self.population_index = 0
         if population_path is not None:
-            self._load_population(population_path)
+            if isfile(population_path):
+                self.population = PopulationArchive(population_path, individual_class)
+            else:
+                self.population = PopulationDirectory(population_path, individual_class,
+                                                      loader_workers, loader_processes)
 
 
     def generate(self, chromosome=None):
@@ -68,18 +128,11 @@ class IndividualGenerator():
         :param chromosome: Use given chromosome value for new individual
                            Random if None.
         """
-        if self.population and chromosome is None:
-            return self.population.pop(0)
+        if self.population_index < len(self.population) and chromosome is None:
+            self.population_index += 1
+            return self.population[self.population_index - 1]
         return self.individual_class(**self.hyperparameters, chromosome=chromosome)
 
     def batch_generate(self, individual_count):
         """Generate a batch of inidividuals"""
         return [self.generate() for _ in range(individual_count)]
-
-
-    def _load_population(self, population_path):
-        files = sorted([join(population_path, f) for f in listdir(population_path)
-                        if isfile(join(population_path, f))])
-
-        for f in files:
-            self.population.append(self.individual_class.from_file(f))
@@ -10,3 +10,7 @@ def sigmoid(values):
 def relu(values):
     """Rectified Lineaar Unit activation function"""
     return np.maximum(0, values)
+
+
+# Activation functions that can be referred to by name, e.g. in population archives
+ACTIVATION_FUNCTIONS = {function.__name__: function for function in (sigmoid, relu)}
@@ -1,13 +1,17 @@
 """Module containing Neural Network model of an Individual"""
 import codecs
 import pickle
-from copy import deepcopy
 import numpy as np
 from ..individual import Individual
+from .activation_functions import ACTIVATION_FUNCTIONS
 
 
 class NNIndividual(Individual):
-    """A Neural Network Individual"""
+    """A Neural Network Individual.
+    All weights and biases are kept in one contiguous buffer, layers hold views into it.
+    """
+
+    ARCHIVE_DTYPE = 'f8'
 
     def __init__(self, layers, activation_functions, chromosome=None):
         """Initialize NNIndividual.
@@ -16,14 +20,40 @@ class NNIndividual(Individual):
                        A list of neuron counts for each layer as well as input count for first layer
         :param activation_functions: A list of activation_functions for each layer.
         :param chromosome: A list of NNLayers. Individual is randomized if None.
+                           Weights and biases of given layers are copied.
         """
         super().__init__()
         if chromosome:
-            self.chromosome = deepcopy(chromosome)
+            layers = [len(chromosome[0].weights[0])] + [len(layer.biases) for layer in chromosome]
+            activation_functions = [layer.activation_function for layer in chromosome]
+            self._bind(np.concatenate([layer.serialize() for layer in chromosome]),
+                       layers, activation_functions)
         else:
-            self.chromosome = []
-            for i, activation in enumerate(activation_functions):
-                self.chromosome.append(NNLayer(layers[i], layers[i+1], activation))
+            self._bind(np.empty(self.parameters_len(layers)), layers, activation_functions)
+            for layer in self.chromosome:
+                layer.weights[:] = np.random.randn(*layer.weights.shape) * 0.1
+                layer.biases[:] = np.random.randn(*layer.biases.shape) * 0.1
+
+
+    def _bind(self, parameters, layers, activation_functions):
+        """Use given buffer as parameters and create layers that are views into it"""
+        self.layers = tuple(layers)
+        self.activation_functions = tuple(activation_functions)
+        self.parameters = parameters
+        self.chromosome = []
+        pointer = 0
+        for i, activation_function in enumerate(self.activation_functions):
+            layer_size = self.layers[i+1] * (1 + self.layers[i])
+            self.chromosome.append(NNLayer.view(parameters[pointer:pointer+layer_size],
+                                                self.layers[i], self.layers[i+1],
+                                                activation_function))
+            pointer += layer_size
+
+
+    @staticmethod
+    def parameters_len(layers):
+        """Return number of weights and biases for given layer architecture"""
+        return sum(layers[i+1] * (1 + layers[i]) for i in range(len(layers) - 1))
 
 
     def evaluate(self, inputs):
@@ -34,6 +64,82 @@ class NNIndividual(Individual):
         return list(result.swapaxes(0, 1)[0])
 
 
+    def evaluate_batch(self, inputs):
+        """Evaluate a (samples x inputs) matrix and return (samples x outputs) array"""
+        result = np.asarray(inputs, dtype=float)
+        for layer in self.chromosome:
+            result = layer.propagate_batch(result)
+        return result
+
+
+    @staticmethod
+    def evaluate_population(individuals, inputs):
+        """Evaluate a (samples x inputs) matrix on each of given individuals
+        and return (individuals x samples x outputs) array.
+        Individuals with the same architecture are stacked and evaluated together.
+        """
+        inputs = np.asarray(inputs, dtype=float)
+        groups = {}
+        for i, individual in enumerate(individuals):
+            groups.setdefault((individual.layers, individual.activation_functions), []).append(i)
+
+        outputs = None
+        for (layers, activation_functions), indices in groups.items():
+            parameters = NNIndividual.stack_parameters([individuals[i] for i in indices])
+            result = inputs
+            pointer = 0
+            for i, activation_function in enumerate(activation_functions):
+                layer_size = layers[i+1] * (1 + layers[i])
+                layer = parameters[:, pointer:pointer+layer_size].reshape(len(indices),
+                                                                          layers[i+1],
+                                                                          layers[i] + 1)
+                # (individuals x samples x inputs) @ (individuals x inputs x neurons)
+                result = activation_function(np.matmul(result, layer[:, :, :-1].transpose(0, 2, 1))
+                                             + layer[:, np.newaxis, :, -1])
+                pointer += layer_size
+
+            if outputs is None:
+                outputs = np.empty((len(individuals),) + result.shape[1:])
+            outputs[indices] = result
+
+        return outputs
+
+
+    @staticmethod
+    def stack_parameters(individuals):
+        """Return (individuals x parameters) matrix of given individuals' parameters.
+        If the individuals are rows of one matrix in the same order, that matrix is returned.
+        """
+        matrix = shared_parameters(individuals, ordered=True)
+        if matrix is not None:
+            return matrix
+        return np.stack([individual.parameters for individual in individuals])
+
+
+    def copy(self):
+        """Return a copy of self. Parameters are copied with a single buffer copy."""
+        clone = self.__class__.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+        clone._bind(self.parameters.copy(), self.layers, self.activation_functions)
+        return clone
+
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+
+    def __getstate__(self):
+        """Layers are views into parameters, so only parameters are pickled"""
+        state = self.__dict__.copy()
+        del state['chromosome']
+        return state
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._bind(self.parameters, self.layers, self.activation_functions)
+
+
     def to_file(self, file_path):
         """Save the individual to a file"""
         with open(file_path, 'w') as export_file:
@@ -61,24 +167,97 @@ class NNIndividual(Individual):
 
 
     def serialize(self):
-        """Return a one dimensional list representation of the individual"""
-        l = []
-        for layer in self.chromosome:
-            l.extend(layer.serialize())
-        return l
+        """Return a one dimensional array representation of the individual.
+        The array is the parameters buffer itself, not a copy.
+        """
+        return self.parameters
+
+
+    def archive_hyperparameters(self):
+        """Return JSON serializable hyperparameters for population archives"""
+        names = []
+        for function in self.activation_functions:
+            if ACTIVATION_FUNCTIONS.get(function.__name__) is not function:
+                raise ValueError(f'Activation function {function.__name__} is not registered '
+                                 'in ACTIVATION_FUNCTIONS')
+            names.append(function.__name__)
+        return {'layers': list(self.layers), 'activation_functions': names}
+
+
+    def archive_genes(self):
+        """Return parameters buffer for population archives"""
+        return self.parameters
+
+
+    @staticmethod
+    def archive_registry(hyperparameters):
+        """Return names of activation functions used by archived hyperparameters"""
+        return sorted(set(hyperparameters['activation_functions']))
+
+
+    @staticmethod
+    def from_archive_hyperparameters(hyperparameters, registry):
+        """Return constructor hyperparameters from archived ones"""
+        unknown = [name for name in registry if name not in ACTIVATION_FUNCTIONS]
+        if unknown:
+            raise ValueError(f'Archive uses activation functions that are not registered: '
+                             f'{unknown}')
+
+        return {
+            'layers': tuple(hyperparameters['layers']),
+            'activation_functions': tuple(ACTIVATION_FUNCTIONS[name] for name
+                                          in hyperparameters['activation_functions']),
+        }
+
+
+    @staticmethod
+    def from_archive(hyperparameters, genes):
+        """Return NNIndividual built from hyperparameters and archived parameters"""
+        return NNIndividual.from_parameters(np.array(genes, dtype=float), **hyperparameters)
 
 
     @staticmethod
     def deserialize(data, layers, activation_functions):
         """Return a NNIndividual from given serialized data"""
-        chromosome = []
-        pointer = 0
-        for i, activation_function in enumerate(activation_functions):
-            layer_size = layers[i+1] * (1 + layers[i])
-            chromosome.append(NNLayer.deserialize(data[pointer:pointer+layer_size], layers[i],
-                                                  layers[i+1], activation_function))
-            pointer += layer_size
-        return NNIndividual(layers, activation_functions, chromosome=chromosome)
+        return NNIndividual.from_parameters(np.array(data, dtype=float), layers,
+                                            activation_functions)
+
+
+    @staticmethod
+    def from_parameters(parameters, layers, activation_functions):
+        """Return a NNIndividual that uses given array as its parameters buffer (without copying)"""
+        if len(parameters) != NNIndividual.parameters_len(layers):
+            raise ValueError(f'Invalid parameters length ({len(parameters)}) '
+                             f'for given layers {layers}')
+        nn = NNIndividual.__new__(NNIndividual)
+        Individual.__init__(nn)
+        nn._bind(parameters, layers, activation_functions)
+        return nn
+
+
+def shared_parameters(individuals, ordered=False):
+    """Return the matrix whose rows are exactly the parameters of given individuals
+    or None if there is no such matrix.
+
+    :param ordered: If true, i-th row has to belong to i-th individual
+    """
+    if not individuals:
+        return None
+    matrix = individuals[0].parameters.base
+    if matrix is None or matrix.ndim != 2 or len(matrix) != len(individuals):
+        return None
+
+    rows = set()
+    for individual in individuals:
+        if individual.parameters.base is not matrix:
+            return None
+        rows.add((individual.parameters.ctypes.data - matrix.ctypes.data) // matrix.strides[0])
+    if len(rows) != len(individuals):
+        return None
+    if ordered and any(individual.parameters.ctypes.data != matrix[i].ctypes.data
+                       for i, individual in enumerate(individuals)):
+        return None
+    return matrix
 
 
 
@@ -96,6 +275,10 @@ class NNLayer:
         """Propagate given values throught the layer"""
         return self.activation_function(np.dot(self.weights, values) + self.biases)
 
+    def propagate_batch(self, values):
+        """Propagate given (samples x inputs) matrix throught the layer"""
+        return self.activation_function(np.dot(values, self.weights.T) + self.biases.T)
+
     def __str__(self):
         """Pickle the layer and save it to string"""
         return codecs.encode(pickle.dumps(self), 'base64').decode()
@@ -106,14 +289,18 @@ class NNLayer:
         return pickle.loads(codecs.decode(string.encode(), 'base64'))
 
     def serialize(self):
-        """Return a one dimensional list representation of the layer"""
-        layer_len = len(self.weights[0])*len(self.biases)+len(self.biases)
-        return np.append(self.weights, self.biases, axis=1).reshape(layer_len).tolist()
+        """Return a one dimensional array representation of the layer"""
+        return np.append(self.weights, self.biases, axis=1).ravel()
 
     @staticmethod
     def deserialize(data, input_count, neuron_count, activation_function):
         """Return a NNLayer instance from given serialized data"""
-        array = np.array(data).reshape(neuron_count, input_count+1)
-        biases = array[:, [-1]]
-        weights = np.delete(array, np.s_[-1], axis=1)
-        return NNLayer(input_count, neuron_count, activation_function, weights, biases)
+        return NNLayer.view(np.array(data, dtype=float), input_count, neuron_count,
+                            activation_function)
+
+    @staticmethod
+    def view(data, input_count, neuron_count, activation_function):
+        """Return a NNLayer whose weights and biases are views into given one dimensional array"""
+        array = data.reshape(neuron_count, input_count+1)
+        return NNLayer(input_count, neuron_count, activation_function,
+                       array[:, :-1], array[:, -1:])
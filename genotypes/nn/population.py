@@ -0,0 +1,42 @@
+"""Module containing population of Neural Network Individuals stored in one matrix"""
+import numpy as np
+from .nn import NNIndividual
+
+
+class NNPopulation:
+    """A population of NNIndividuals with the same architecture.
+    Parameters of i-th individual are i-th row of the parameters matrix,
+    so operations on the whole population are single NumPy operations.
+    """
+
+    def __init__(self, parameters, layers, activation_functions):
+        """Initialize the population
+
+        :param parameters: (individuals x parameters) matrix, used without copying
+        :param layers: Layer architecture of the individuals
+        :param activation_functions: Activation functions of the individuals
+        """
+        self.parameters = parameters
+        self.layers = tuple(layers)
+        self.activation_functions = tuple(activation_functions)
+        self.individuals = [NNIndividual.from_parameters(row, layers, activation_functions)
+                            for row in parameters]
+
+    @staticmethod
+    def cross(first_parents, second_parents, points):
+        """Return a (2*pairs x parameters) matrix of children made by k-point crossover between
+        pairs of parents. Children of i-th pair are on rows 2i and 2i+1.
+
+        :param first_parents: (pairs x parameters) matrix of first parents
+        :param second_parents: (pairs x parameters) matrix of second parents
+        :param points: (pairs x k) matrix of distinct crossover points for each pair
+        """
+        # Genes after an odd number of crossover points are switched
+        switch = np.zeros(first_parents.shape, dtype=np.int8)
+        switch[np.arange(len(points))[:, np.newaxis], points] = 1
+        switch = np.cumsum(switch, axis=1) % 2 == 1
+
+        children = np.empty((2 * len(first_parents), first_parents.shape[1]))
+        children[0::2] = np.where(switch, second_parents, first_parents)
+        children[1::2] = np.where(switch, first_parents, second_parents)
+        return children
@@ -1,5 +1,7 @@
 from algorithms.evolution_strategy import EvolutionStrategy
+from algorithms.phenotype_cache import PhenotypeCache
 from reporters.best_individual_reporter import BestIndividualReporter
+from reporters.phenotype_cache_reporter import PhenotypeCacheReporter
 from evaluators.breezy.breezy import BreezyEvaluator
 from evaluators.breezy.reinforcers import last_hit, win
 from mutations.cgp.smart_mutation import CGPSmartMutation
@@ -11,13 +13,15 @@ def main():
                                 listener_address=('127.0.0.1', 8088),
                                 breezy_url='http://127.0.0.1:8085')
 
-    reporters = [BestIndividualReporter()]
+    phenotype_cache = PhenotypeCache(reevaluation_probability=0.1)
+    reporters = [BestIndividualReporter(), PhenotypeCacheReporter(phenotype_cache)]
 
     cgp_hyperparams = {
         'input_len': evaluator.input_len,
         'grid_size': (50, 30),
         'output_len': evaluator.output_len,
-        'constant_len': 4
+        'constant_len': 4,
+        'compiled': True,
     }
     generator = IndividualGenerator(CGPIndividual, cgp_hyperparams)
 
@@ -27,7 +31,8 @@ def main():
     parent_count = 2
     children_count = 4
     alg = EvolutionStrategy(reporters, max_iterations, evaluator, generator,
-                            parent_count, children_count, mutation, elitism=True, target_fitness=1000000)
+                            parent_count, children_count, mutation, elitism=True, target_fitness=1000000,
+                            phenotype_cache=phenotype_cache)
 
     alg.run()
 
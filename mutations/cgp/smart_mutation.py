@@ -13,49 +13,12 @@ class CGPSmartMutation(CGPMutation):
 
         :param individual: the individual to mutate
         """
-        active_indices = self._get_active_indices(individual)
+        active_indices = individual.active_genes()
         indices = random.sample(active_indices, k=self.n)
+        active_indices = set(active_indices)
         for index in indices:
             self.mutate_index(individual, index)
 
         for index in range(len(individual.chromosome)):
             if index not in active_indices:
                 self.mutate_index(individual, index)
-
-
-    @staticmethod
-    def _get_active_indices(individual):
-        """Return a list of active indices for given individual"""
-        active_modules = set()
-        active_indices = set()
-        to_check = set()
-
-        for i in range(len(individual.chromosome)-individual.output_len,
-                       len(individual.chromosome)):
-            active_indices.add(i)
-
-        for output in individual.chromosome[-individual.output_len:]:
-            if individual.input_len <= output < individual.output_len + individual.constant_len:
-                active_indices.add(output)
-            elif output >= individual.input_len + individual.constant_len:
-                to_check.add(output)
-
-        while to_check:
-            current = to_check.pop()
-            active_modules.add(current)
-            index = individual.module_index(current)
-            if ((individual.chromosome[index + 0] >= individual.input_len + individual.constant_len)
-                    and individual.chromosome[index + 0] not in active_modules):
-                to_check.add(individual.chromosome[index + 0])
-            elif individual.chromosome[index + 0] >= individual.input_len:
-                active_indices.add(individual.chromosome[index + 0])
-            if ((individual.chromosome[index + 1] >= individual.input_len + individual.constant_len)
-                    and individual.chromosome[index + 1] not in active_modules):
-                to_check.add(individual.chromosome[index + 1])
-            elif individual.chromosome[index + 1] >= individual.input_len:
-                active_indices.add(individual.chromosome[index + 1])
-            active_indices.add(index + 0)
-            active_indices.add(index + 1)
-            active_indices.add(index + 2)
-
-        return list(active_indices)
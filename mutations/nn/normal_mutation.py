@@ -1,5 +1,6 @@
 """Module containing normal mutation for NNIndividual"""
 import numpy as np
+from genotypes.nn.nn import shared_parameters
 from ..mutation import Mutation
 
 
@@ -16,6 +17,15 @@ class NNNormalMutation(Mutation):
 
     def mutate(self, individual):
         """Mutate given Neural Network Individual"""
-        for layer in individual.chromosome:
-            layer.weights += np.random.normal(scale=self.stddev, size=layer.weights.shape)
-            layer.biases += np.random.normal(scale=self.stddev, size=layer.biases.shape)
+        individual.parameters += np.random.normal(scale=self.stddev,
+                                                  size=individual.parameters.shape)
+
+    def batch_mutate(self, individuals):
+        """Mutate given group of Neural Network Individuals.
+        If they are rows of one population matrix, noise is drawn and added in one go.
+        """
+        matrix = shared_parameters(individuals)
+        if matrix is None:
+            super().batch_mutate(individuals)
+        else:
+            matrix += np.random.normal(scale=self.stddev, size=matrix.shape)
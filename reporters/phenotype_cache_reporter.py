@@ -0,0 +1,19 @@
+"""Module containing Reporter implementation that reports phenotype cache statistics"""
+from .reporter import Reporter
+
+
+class PhenotypeCacheReporter(Reporter):
+    """Phenotype Cache Reporter class"""
+
+    def __init__(self, phenotype_cache):
+        """Initialize the reporter
+
+        :param phenotype_cache: PhenotypeCache to report on
+        """
+        super().__init__()
+        self.phenotype_cache = phenotype_cache
+
+    def report(self, individuals):
+        """Report cache hits and misses so far"""
+        print(f'Phenotype cache hits: {self.phenotype_cache.hits}, '
+              f'misses: {self.phenotype_cache.misses}')
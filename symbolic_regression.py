@@ -18,6 +18,7 @@ def main():
         'grid_size': (3, 3),
         'output_len': 1,
         'constant_len': 4,
+        'compiled': True,
     }
     generator = IndividualGenerator(CGPIndividual, cgp_hyperparams)
 